@@ -11,6 +11,7 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-this-secret-key"
     jwt_algorithm: str = "HS256"
     jwt_expiration_hours: int = 24
+    jwt_negative_cache: bool = True  # Briefly remember rejected tokens so stale ones are refused without re-verifying
 
     # Microsoft OAuth
     microsoft_client_id: str = ""
@@ -24,6 +25,11 @@ class Settings(BaseSettings):
     # Google Cloud / Vertex AI (preferred — more reliable than direct Gemini API)
     google_cloud_project: str = ""
     google_application_credentials_json: str = ""  # Full JSON service account key
+    gemini_max_concurrency: int = 8  # Max in-flight image generation requests per process
+    gemini_rps: float = 2.0  # Sustained image generation requests/sec per process (0 disables)
+    gemini_burst: int = 6  # Requests allowed back-to-back before gemini_rps applies
+    gemini_breaker_fail_max: int = 10  # Consecutive failures before image requests are shed
+    gemini_breaker_reset_seconds: float = 30.0  # How long to shed before probing again
 
     # EBizCharge Payment Gateway
     ebizcharge_source_key: str = ""
@@ -68,6 +74,9 @@ class Settings(BaseSettings):
     backend_url: str = "http://localhost:8000"
     store_frontend_url: str = "http://localhost:5174"
 
+    # Logging
+    log_level: str = "INFO"  # DEBUG enables per-attempt image generation traces
+
     # Cloudflare R2 Storage
     r2_account_id: str = ""
     r2_access_key_id: str = ""
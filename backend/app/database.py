@@ -19,6 +19,9 @@ engine = create_engine(
     settings.database_url,
     connect_args=connect_args,
     pool_pre_ping=True,  # Helps with database connection reliability
+    # Compiled-statement cache; sized above the 500 default so the many
+    # distinct router queries don't evict hot ones like the auth user load
+    query_cache_size=1200,
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -506,6 +509,36 @@ def _migrate_order_item_hat_color(engine, inspector):
             print("Migration: Added hat_color column to order_items table")
 
 
+def _migrate_design_lookup_indexes(engine, inspector):
+    """Add composite indexes for version fallback lookups and brand listings.
+
+    design_quotes.design_id already has a unique index, so it needs nothing here.
+    """
+    from sqlalchemy import text
+
+    indexes = {
+        'design_versions': (
+            "ix_design_versions_lookup",
+            "design_versions (design_id, generation_status, version_number DESC)",
+        ),
+        'designs': (
+            "ix_designs_brand_created",
+            "designs (brand_name, created_at DESC)",
+        ),
+    }
+    table_names = inspector.get_table_names()
+    for table, (index_name, index_def) in indexes.items():
+        if table not in table_names:
+            continue
+        existing = {ix['name'] for ix in inspector.get_indexes(table)}
+        if index_name in existing:
+            continue
+        with engine.connect() as conn:
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {index_name} ON {index_def}"))
+            conn.commit()
+            print(f"Migration: Added {index_name} index to {table} table")
+
+
 def init_db():
     """Initialize database tables."""
     from . import models  # Import models to register them
@@ -518,3 +551,4 @@ def init_db():
     _migrate_order_design_link(engine, inspect(engine))
     _migrate_sample_discount(engine, inspect(engine))
     _migrate_order_item_hat_color(engine, inspect(engine))
+    _migrate_design_lookup_indexes(engine, inspect(engine))
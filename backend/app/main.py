@@ -4,10 +4,15 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
+import logging
+import logging.handlers
 import os
+import queue
+from typing import Tuple
 
 from .config import get_settings
 from .database import init_db, SessionLocal
+from .services.gemini_service import close_http_client, init_gemini
 from .models import Team
 from .routers import auth, customers, brands, designs, uploads, ai, users, quotes, design_quotes, custom_designs
 from .routers.uploads import uploads_router
@@ -21,18 +26,47 @@ from .services.store_seed_service import seed_store_data
 settings = get_settings()
 
 
+def configure_logging() -> Tuple[logging.handlers.QueueHandler, logging.handlers.QueueListener]:
+    """
+    Route app logs through a queue so request handlers never block on stdout.
+
+    Handlers only enqueue records; a listener thread formats and writes them.
+    Returns the installed handler and the started listener; the caller
+    removes the one and stops the other on shutdown.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream)
+
+    handler = logging.handlers.QueueHandler(log_queue)
+    root = logging.getLogger()
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+    listener.start()
+    return handler, listener
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events."""
     # Startup
-    init_db()
-    seed_default_data()
-    seed_store()
-    seed_test_customer()
-    # seed_pipeline_stages()  # disabled until routers/pipeline.py + models/job.py are committed
-    yield
-    # Shutdown
-    pass
+    log_handler, log_listener = configure_logging()
+    try:
+        init_db()
+        init_gemini()
+        seed_default_data()
+        seed_store()
+        seed_test_customer()
+        # seed_pipeline_stages()  # disabled until routers/pipeline.py + models/job.py are committed
+        yield
+        # Shutdown
+        await close_http_client()
+    finally:
+        # Detach before stopping so a later lifespan (reload, TestClient)
+        # doesn't inherit a handler feeding a queue nobody drains.
+        logging.getLogger().removeHandler(log_handler)
+        log_listener.stop()
 
 
 app = FastAPI(
@@ -61,6 +95,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 
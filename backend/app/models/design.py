@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey
+from sqlalchemy import Column, String, Integer, Text, Boolean, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -42,6 +42,11 @@ class Design(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Brand listings filter on brand_name and sort newest first.
+        Index("ix_designs_brand_created", brand_name, created_at.desc()),
+    )
+
     # Relationships
     # Explicit foreign_keys: Design has two FKs to users.id (created_by_id and
     # library_published_by_id), so SQLAlchemy needs to be told which one this
@@ -74,6 +79,12 @@ class DesignVersion(Base):
     detected_decorations = Column(Text, nullable=True)  # JSON: {"front": "3D Embroidery", "left": "Woven Patch", ...}
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Covers the "latest completed version" fallback lookup
+        # (design_id = ? AND generation_status = ? ORDER BY version_number DESC).
+        Index("ix_design_versions_lookup", design_id, generation_status, version_number.desc()),
+    )
+
     # Relationships
     design = relationship("Design", back_populates="versions")
 
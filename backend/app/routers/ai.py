@@ -5,7 +5,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
 from ..services.gemini_service import scrape_brand_info
-from ..services.storage_service import read_file_bytes
+from ..services.storage_service import read_file_bytes, image_mime_type
 from ..utils.dependencies import require_auth
 
 router = APIRouter(prefix="/ai", tags=["AI"])
@@ -23,17 +23,6 @@ class BrandScrapeResponse(BaseModel):
     message: Optional[str] = None
 
 
-def _mime_from_path(path: str) -> str:
-    lower = path.lower()
-    if lower.endswith(".png"):
-        return "image/png"
-    if lower.endswith((".jpg", ".jpeg")):
-        return "image/jpeg"
-    if lower.endswith(".webp"):
-        return "image/webp"
-    return "image/png"
-
-
 @router.post("/brand-scrape", response_model=BrandScrapeResponse)
 async def scrape_brand(
     request: BrandScrapeRequest,
@@ -58,7 +47,7 @@ async def scrape_brand(
         try:
             logo_bytes = await read_file_bytes(request.logo_path)
             if logo_bytes:
-                logo_mime = _mime_from_path(request.logo_path)
+                logo_mime = image_mime_type(request.logo_path)
         except Exception as e:
             print(f"[BrandScrape] Could not read logo {request.logo_path}: {e}")
 
@@ -3,7 +3,7 @@
 import asyncio
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
@@ -28,7 +28,11 @@ from ..services.design_service import (
     create_revision,
     create_revision_v2,
     get_design_with_versions,
+    get_design_cached,
+    invalidate_design_cache,
     search_designs,
+    encode_design_cursor,
+    decode_design_cursor,
     VERSIONS_PER_BATCH,
 )
 from ..services.gemini_service import generate_design, extract_decorations_from_image
@@ -66,6 +70,7 @@ async def _extract_decorations_background(version_ids: list[str]):
             if decorations:
                 version.detected_decorations = json_module.dumps(decorations)
                 db.commit()
+                invalidate_design_cache(version.design_id)
                 print(f"[DecorationExtract] Saved decorations for version {vid}: {decorations}")
             db.close()
         except Exception as e:
@@ -74,6 +79,7 @@ async def _extract_decorations_background(version_ids: list[str]):
 
 @router.get("", response_model=List[DesignListResponse])
 async def list_designs(
+    response: Response,
     brand_name: Optional[str] = Query(None),
     customer_name: Optional[str] = Query(None),
     approval_status: Optional[str] = Query(None),
@@ -82,10 +88,20 @@ async def list_designs(
     end_date: Optional[datetime] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Keyset cursor from the previous page's X-Next-Cursor header"),
     db: Session = Depends(get_db),
     user=Depends(require_auth),
 ):
-    """List designs for the current user. Optionally include team-shared designs."""
+    """List designs for the current user. Optionally include team-shared designs.
+
+    When a full page is returned, the X-Next-Cursor response header carries
+    the cursor for the next page.
+    """
+    try:
+        decoded_cursor = decode_design_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     designs = search_designs(
         db=db,
         brand_name=brand_name,
@@ -97,7 +113,10 @@ async def list_designs(
         end_date=end_date,
         skip=skip,
         limit=limit,
+        cursor=decoded_cursor,
     )
+    if len(designs) == limit:
+        response.headers["X-Next-Cursor"] = encode_design_cursor(designs[-1])
     return designs
 
 
@@ -134,7 +153,7 @@ async def get_design(
     user=Depends(get_current_user),
 ):
     """Get a design with all versions, logos, and chat history."""
-    design = get_design_with_versions(db, design_id)
+    design = get_design_cached(db, design_id)
     if not design:
         raise HTTPException(status_code=404, detail="Design not found")
     return design
@@ -321,6 +340,7 @@ async def extract_version_decorations(
     if decorations:
         version.detected_decorations = json_module.dumps(decorations)
         db.commit()
+        invalidate_design_cache(version.design_id)
         return {"success": True, "decorations": decorations}
     else:
         return {"success": False, "decorations": None}
@@ -339,7 +339,7 @@ async def export_overseas_quote(request: OverseasQuoteRequest):
     row += 1
     ws.cell(row=row, column=1, value="Hat")
     for col, pb in enumerate(price_breaks, 2):
-        if pb["per_piece_price"] is None:
+        if not pb["meets_moq"]:
             style_currency_cell(ws.cell(row=row, column=col), None)
         else:
             hat_cost = (
@@ -358,7 +358,7 @@ async def export_overseas_quote(request: OverseasQuoteRequest):
     row += 1
     ws.cell(row=row, column=1, value="Shipping")
     for col, pb in enumerate(price_breaks, 2):
-        if pb["per_piece_price"] is None:
+        if not pb["meets_moq"]:
             style_currency_cell(ws.cell(row=row, column=col), None)
         else:
             style_currency_cell(ws.cell(row=row, column=col), pb["shipping_price"] or 0)
@@ -498,7 +498,7 @@ async def export_quote_sheet(request: QuoteSheetExportRequest):
                 current_row += 1
                 ws.cell(row=current_row, column=1, value="Hat")
                 for col, pb in enumerate(price_breaks, 2):
-                    if pb["per_piece_price"] is None:
+                    if not pb["meets_moq"]:
                         style_currency_cell(ws.cell(row=current_row, column=col), None)
                     else:
                         hat_cost = (
@@ -517,7 +517,7 @@ async def export_quote_sheet(request: QuoteSheetExportRequest):
                 current_row += 1
                 ws.cell(row=current_row, column=1, value="Shipping")
                 for col, pb in enumerate(price_breaks, 2):
-                    if pb["per_piece_price"] is None:
+                    if not pb["meets_moq"]:
                         style_currency_cell(ws.cell(row=current_row, column=col), None)
                     else:
                         style_currency_cell(ws.cell(row=current_row, column=col), pb["shipping_price"] or 0)
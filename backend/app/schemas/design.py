@@ -294,3 +294,11 @@ class DesignListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+    @field_validator('style_directions', mode='before')
+    @classmethod
+    def split_style_directions(cls, v):
+        # Design rows store style directions comma-separated.
+        if isinstance(v, str):
+            return v.split(",") if v else []
+        return v or []
@@ -1,15 +1,16 @@
 """Design service for managing designs and versions."""
 
 import asyncio
-from typing import Optional, List, Dict, Any
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
-from sqlalchemy import func, or_
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func, or_, select, tuple_, update
 
 from ..models import Design, DesignVersion, DesignChat, DesignQuote
 from ..models.design import DesignLogo
 from ..models.user import User
-from ..schemas.design import DesignCreate, DesignUpdate, RevisionCreate, Industry
+from ..schemas.design import DesignCreate, DesignUpdate, DesignResponse, RevisionCreate, Industry
 from .gemini_service import generate_design, generate_revision, generate_revision_v2
 from .storage_service import save_generated_image
 
@@ -59,6 +60,53 @@ def _decode_industries(stored: Optional[str]) -> List[str]:
 VERSIONS_PER_BATCH = 3
 
 
+async def _indexed(index: int, coro) -> tuple:
+    """Await a generation coroutine, tagging the outcome with its batch index.
+    Exceptions are returned rather than raised (same as gather's
+    return_exceptions=True)."""
+    try:
+        return index, await coro
+    except Exception as e:
+        return index, e
+
+
+async def _save_if_generated(result: Any, design_id: str, version_number: int) -> Optional[str]:
+    """Persist a generation's image if it produced one; returns the stored path."""
+    if isinstance(result, Exception) or not (result.get("success") and result.get("image_data")):
+        return None
+    return await save_generated_image(
+        image_data=result["image_data"],
+        design_id=design_id,
+        version_number=version_number,
+    )
+
+
+async def _generate_versions(
+    generations: List[Any],
+    design_id: str,
+    first_version_number: int,
+) -> List[tuple]:
+    """
+    Run generation coroutines in parallel and save each image the moment its
+    generation finishes, so storage uploads overlap with the slower generators
+    instead of waiting for the whole batch.
+
+    Returns (result, image_path) pairs in the original batch order; result is
+    the generator's dict or the exception it raised, image_path is None when
+    nothing was saved.
+    """
+    results: List[Any] = [None] * len(generations)
+    save_tasks: Dict[int, asyncio.Task] = {}
+    for fut in asyncio.as_completed([_indexed(i, g) for i, g in enumerate(generations)]):
+        i, result = await fut
+        results[i] = result
+        save_tasks[i] = asyncio.create_task(
+            _save_if_generated(result, design_id, first_version_number + i)
+        )
+    image_paths = await asyncio.gather(*(save_tasks[i] for i in range(len(generations))))
+    return list(zip(results, image_paths))
+
+
 def get_next_design_number(db: Session, brand_name: str) -> int:
     """Get the next design number for a brand."""
     max_number = (
@@ -102,8 +150,9 @@ async def create_design(
         created_by_id=user_id,
     )
     db.add(design)
-    db.commit()
-    db.refresh(design)
+    # Flush (not commit) so design.id is available for the logo rows — the
+    # design and its logos are persisted together in a single commit below.
+    db.flush()
 
     # Save DesignLogo records if multi-logo provided
     design_logos = []
@@ -119,7 +168,6 @@ async def create_design(
             )
             db.add(logo)
             design_logos.append(logo)
-        db.commit()
     elif design_data.logo_path:
         # Backward compat: convert single logo_path to DesignLogo
         logo = DesignLogo(
@@ -132,7 +180,8 @@ async def create_design(
         )
         db.add(logo)
         design_logos.append(logo)
-        db.commit()
+
+    db.commit()
 
     # Build logos_data for prompt builder
     logos_data = [
@@ -168,11 +217,11 @@ async def create_design(
             )
         )
 
-    # Run all 3 generations in parallel
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    # Run all 3 generations in parallel, saving each image as it lands
+    outcomes = await _generate_versions(tasks, design.id, first_version_number=1)
 
     # Process results, creating 3 DesignVersion records
-    for i, result in enumerate(results):
+    for i, (result, image_path) in enumerate(outcomes):
         version_number = i + 1
         is_exception = isinstance(result, Exception)
 
@@ -183,12 +232,7 @@ async def create_design(
             prompt=result.get("prompt", "") if not is_exception else "",
         )
 
-        if not is_exception and result.get("success") and result.get("image_data"):
-            image_path = await save_generated_image(
-                image_data=result["image_data"],
-                design_id=design.id,
-                version_number=version_number,
-            )
+        if image_path:
             version.image_path = image_path
             version.generation_status = "completed"
         else:
@@ -212,25 +256,23 @@ def update_design(
     design_id: str,
     update_data: DesignUpdate,
 ) -> Optional[Design]:
-    """Update design metadata (name, approval status, shared status)."""
-    design = db.query(Design).filter(Design.id == design_id).first()
-    if not design:
-        return None
-
-    if update_data.design_name is not None:
-        design.design_name = update_data.design_name
-    if update_data.customer_name is not None:
-        design.customer_name = update_data.customer_name
-    if update_data.brand_name is not None:
-        design.brand_name = update_data.brand_name
-    if update_data.approval_status is not None:
-        design.approval_status = update_data.approval_status.value
-    if update_data.shared_with_team is not None:
-        design.shared_with_team = update_data.shared_with_team
+    """Update design metadata (name, approval status, shared status).
 
-    design.updated_at = datetime.utcnow()
+    Issues a single UPDATE ... RETURNING instead of SELECT, mutate, commit
+    and refresh. Returns None when the design doesn't exist.
+    """
+    updates = update_data.model_dump(exclude_none=True)
+    if "approval_status" in updates:
+        updates["approval_status"] = update_data.approval_status.value
+
+    stmt = (
+        update(Design)
+        .where(Design.id == design_id)
+        .values(**updates, updated_at=datetime.utcnow())
+        .returning(Design)
+    )
+    design = db.execute(stmt).scalar_one_or_none()
     db.commit()
-    db.refresh(design)
     return design
 
 
@@ -309,11 +351,13 @@ async def create_revision_v2(
         )
         for _ in range(VERSIONS_PER_BATCH)
     ]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    outcomes = await _generate_versions(
+        tasks, design.id, first_version_number=current_max_version + 1
+    )
 
     versions: List[DesignVersion] = []
     any_success = False
-    for i, result in enumerate(results):
+    for i, (result, image_path) in enumerate(outcomes):
         v_num = current_max_version + i + 1
         is_exception = isinstance(result, Exception)
 
@@ -324,12 +368,7 @@ async def create_revision_v2(
             prompt=result.get("prompt", "") if not is_exception else "",
         )
 
-        if not is_exception and result.get("success") and result.get("image_data"):
-            image_path = await save_generated_image(
-                image_data=result["image_data"],
-                design_id=design.id,
-                version_number=v_num,
-            )
+        if image_path:
             version.image_path = image_path
             version.generation_status = "completed"
             any_success = True
@@ -483,6 +522,20 @@ async def create_revision(
     return version
 
 
+def _serialize_quote(quote: Optional[DesignQuote]) -> Optional[Dict[str, Any]]:
+    """Quote summary for design responses; cached totals are stored in cents."""
+    if quote is None:
+        return None
+    return {
+        "id": quote.id,
+        "quote_type": quote.quote_type,
+        "quantity": quote.quantity,
+        "cached_total": quote.cached_total / 100 if quote.cached_total else None,
+        "cached_per_piece": quote.cached_per_piece / 100 if quote.cached_per_piece else None,
+        "updated_at": quote.updated_at,
+    }
+
+
 def get_design_with_versions(db: Session, design_id: str) -> Optional[Dict[str, Any]]:
     """Get a design with all its versions, logos, and chat history."""
     design = db.query(Design).filter(Design.id == design_id).first()
@@ -494,16 +547,7 @@ def get_design_with_versions(db: Session, design_id: str) -> Optional[Dict[str,
 
     # Get quote summary if exists
     quote = db.query(DesignQuote).filter(DesignQuote.design_id == design_id).first()
-    quote_summary = None
-    if quote:
-        quote_summary = {
-            "id": quote.id,
-            "quote_type": quote.quote_type,
-            "quantity": quote.quantity,
-            "cached_total": quote.cached_total / 100 if quote.cached_total else None,
-            "cached_per_piece": quote.cached_per_piece / 100 if quote.cached_per_piece else None,
-            "updated_at": quote.updated_at,
-        }
+    quote_summary = _serialize_quote(quote)
 
     return {
         "id": design.id,
@@ -536,21 +580,117 @@ def get_design_with_versions(db: Session, design_id: str) -> Optional[Dict[str,
     }
 
 
+# Serialized design detail payloads, keyed by design id. Each entry carries
+# the fingerprint it was built from, so a changed design simply misses.
+_design_detail_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_DESIGN_DETAIL_CACHE_MAX = 256
+
+
+def _design_fingerprint(db: Session, design_id: str) -> Optional[tuple]:
+    """One-query change marker for everything get_design_with_versions returns.
+
+    Design and quote rows carry updated_at; versions, chats and logos are
+    append/delete only, so their counts are enough. In-place version edits
+    (decoration extraction) call invalidate_design_cache explicitly.
+    """
+    def child_count(model):
+        return (
+            select(func.count(model.id))
+            .where(model.design_id == Design.id)
+            .scalar_subquery()
+        )
+
+    quote_updated = (
+        select(func.max(DesignQuote.updated_at))
+        .where(DesignQuote.design_id == Design.id)
+        .scalar_subquery()
+    )
+    row = (
+        db.query(
+            Design.updated_at,
+            quote_updated,
+            child_count(DesignVersion),
+            child_count(DesignChat),
+            child_count(DesignLogo),
+        )
+        .filter(Design.id == design_id)
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+def invalidate_design_cache(design_id: str) -> None:
+    """Drop the cached detail payload for a design."""
+    _design_detail_cache.pop(design_id, None)
+
+
+def get_design_cached(db: Session, design_id: str) -> Optional[Dict[str, Any]]:
+    """Read-through cache in front of get_design_with_versions.
+
+    Costs a single fingerprint query on a hit instead of the design, quote,
+    versions, chats and logos queries.
+    """
+    fingerprint = _design_fingerprint(db, design_id)
+    if fingerprint is None:
+        _design_detail_cache.pop(design_id, None)
+        return None
+
+    cached = _design_detail_cache.get(design_id)
+    if cached and cached[0] == fingerprint:
+        _design_detail_cache.move_to_end(design_id)
+        return cached[1]
+
+    design = get_design_with_versions(db, design_id)
+    if design is None:
+        return None
+    payload = DesignResponse.model_validate(design).model_dump()
+    _design_detail_cache[design_id] = (fingerprint, payload)
+    _design_detail_cache.move_to_end(design_id)
+    if len(_design_detail_cache) > _DESIGN_DETAIL_CACHE_MAX:
+        _design_detail_cache.popitem(last=False)
+    return payload
+
+
+# Keyset pagination cursor: (created_at, id) of the last row on the previous page.
+DesignCursor = Tuple[datetime, str]
+
+
+def encode_design_cursor(design: Design) -> str:
+    """Serialize the keyset position after `design`."""
+    return f"{design.created_at.isoformat()}|{design.id}"
+
+
+def decode_design_cursor(cursor: str) -> DesignCursor:
+    """Parse a cursor produced by encode_design_cursor. Raises ValueError if malformed."""
+    created_at, sep, design_id = cursor.partition("|")
+    if not sep or not design_id:
+        raise ValueError("Invalid cursor")
+    return datetime.fromisoformat(created_at), design_id
+
+
+def _paginate_designs(query, cursor: Optional[DesignCursor], skip: int, limit: int):
+    """Order newest-first and page by keyset when a cursor is given.
+
+    A cursor keeps the cost at O(limit) no matter how deep the page; `skip`
+    is only honoured for callers that haven't moved to cursors yet.
+    """
+    if cursor is not None:
+        query = query.filter(tuple_(Design.created_at, Design.id) < cursor)
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(Design.created_at.desc(), Design.id.desc()).limit(limit)
+
+
 def get_designs_for_brand(
     db: Session,
     brand_name: str,
     skip: int = 0,
     limit: int = 50,
+    cursor: Optional[DesignCursor] = None,
 ) -> List[Design]:
     """Get all designs for a brand."""
-    return (
-        db.query(Design)
-        .filter(Design.brand_name == brand_name)
-        .order_by(Design.created_at.desc())
-        .offset(skip)
-        .limit(limit)
-        .all()
-    )
+    query = db.query(Design).filter(Design.brand_name == brand_name)
+    return _paginate_designs(query, cursor, skip, limit).all()
 
 
 def search_designs(
@@ -564,9 +704,37 @@ def search_designs(
     end_date: Optional[datetime] = None,
     skip: int = 0,
     limit: int = 50,
-) -> List[Dict[str, Any]]:
-    """Search designs with filters."""
-    query = db.query(Design)
+    cursor: Optional[DesignCursor] = None,
+) -> List[Design]:
+    """Search designs with filters.
+
+    Returns Design rows annotated with `latest_image_path` and `quote_summary`,
+    ready for serialization by DesignListResponse.
+
+    Pass the `cursor` of the previous page's last row (see encode_design_cursor)
+    for keyset pagination; `skip` remains for offset-based callers.
+    """
+    # Only the columns the listing serializes; skips custom_description and
+    # the other wide text columns a 50-row page never shows.
+    query = db.query(Design).options(load_only(
+        Design.id,
+        Design.customer_name,
+        Design.brand_name,
+        Design.design_name,
+        Design.design_number,
+        Design.current_version,
+        Design.hat_style,
+        Design.material,
+        Design.structure,
+        Design.closure,
+        Design.style_directions,
+        Design.status,
+        Design.approval_status,
+        Design.shared_with_team,
+        Design.created_at,
+        Design.updated_at,
+        Design.selected_version_id,
+    ))
 
     # Filter by user
     if user_id:
@@ -591,23 +759,31 @@ def search_designs(
     if end_date:
         query = query.filter(Design.created_at <= end_date)
 
-    designs = query.order_by(Design.created_at.desc()).offset(skip).limit(limit).all()
+    designs = _paginate_designs(query, cursor, skip, limit).all()
+
+    # Resolve every selected version's image in one IN query rather than
+    # one lookup per design.
+    selected_ids = [d.selected_version_id for d in designs if d.selected_version_id]
+    selected_by_id: Dict[str, Optional[str]] = {}
+    if selected_ids:
+        selected_by_id = dict(
+            db.query(DesignVersion.id, DesignVersion.image_path)
+            .filter(
+                DesignVersion.id.in_(selected_ids),
+                DesignVersion.generation_status == "completed",
+            )
+            .all()
+        )
 
     results = []
     for design in designs:
         # Prefer selected version image, fallback to latest completed
-        if design.selected_version_id:
-            selected_version = db.query(DesignVersion).filter(
-                DesignVersion.id == design.selected_version_id,
-                DesignVersion.generation_status == "completed",
-            ).first()
-            latest_image_path = selected_version.image_path if selected_version else None
-        else:
-            latest_image_path = None
+        latest_image_path = selected_by_id.get(design.selected_version_id)
 
         if not latest_image_path:
             latest_version = (
                 db.query(DesignVersion)
+                .options(load_only(DesignVersion.image_path))
                 .filter(
                     DesignVersion.design_id == design.id,
                     DesignVersion.generation_status == "completed",
@@ -617,40 +793,14 @@ def search_designs(
             )
             latest_image_path = latest_version.image_path if latest_version else None
 
-        style_directions = design.style_directions.split(",") if design.style_directions else []
-
         quote = db.query(DesignQuote).filter(DesignQuote.design_id == design.id).first()
-        quote_summary = None
-        if quote:
-            quote_summary = {
-                "id": quote.id,
-                "quote_type": quote.quote_type,
-                "quantity": quote.quantity,
-                "cached_total": quote.cached_total / 100 if quote.cached_total else None,
-                "cached_per_piece": quote.cached_per_piece / 100 if quote.cached_per_piece else None,
-                "updated_at": quote.updated_at,
-            }
+        quote_summary = _serialize_quote(quote)
 
-        results.append({
-            "id": design.id,
-            "customer_name": design.customer_name,
-            "brand_name": design.brand_name,
-            "design_name": design.design_name,
-            "design_number": design.design_number,
-            "current_version": design.current_version,
-            "hat_style": design.hat_style,
-            "material": design.material,
-            "structure": design.structure,
-            "closure": design.closure,
-            "style_directions": style_directions,
-            "status": design.status,
-            "approval_status": design.approval_status,
-            "shared_with_team": design.shared_with_team,
-            "created_at": design.created_at,
-            "updated_at": design.updated_at,
-            "latest_image_path": latest_image_path,
-            "quote_summary": quote_summary,
-        })
+        # Listing-only values ride along on the row; the route's
+        # DesignListResponse reads everything else straight off the ORM object.
+        design.latest_image_path = latest_image_path
+        design.quote_summary = quote_summary
+        results.append(design)
 
     return results
 
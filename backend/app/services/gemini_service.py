@@ -1,25 +1,42 @@
 """Gemini AI service for brand scraping and image generation."""
 
-import base64
+import copy
+import hashlib
 import json
+import logging
+import random
+import re
+import time
 import httpx
 import asyncio
-from typing import Optional, Dict, Any, List
+import orjson
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
 from pathlib import Path
 
 import google.generativeai as genai
+from pydantic import BaseModel, ValidationError, field_validator
 from PIL import Image
 import io
 
 from ..config import get_settings
 from ..utils.prompt_builder import build_design_prompt, build_revision_prompt
 from ..utils.custom_prompt_builder import build_custom_design_prompt, build_custom_revision_prompt
-from .storage_service import read_file_bytes
+from .storage_service import read_file_bytes, encode_base64, image_mime_type, IMAGE_MIME_BY_SUFFIX
 
 # Supported image formats for Gemini API
 SUPPORTED_IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.webp'}
+# A whole-response markdown code fence (```json ... ``` or ``` ... ```).
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+
+def _strip_code_fence(text: str) -> str:
+    """Return the body of a fenced model reply, or the stripped text as-is."""
+    m = _FENCE_RE.match(text)
+    return m.group(1) if m else text.strip()
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 
 # Layout template — 6-view grid reference image bundled with the backend
 _LAYOUT_TEMPLATE_PATH = Path(__file__).resolve().parent.parent / "assets" / "ai_design_template_v2.jpeg"
@@ -32,21 +49,187 @@ def _get_layout_template_part() -> Optional[Dict[str, Any]]:
     if _layout_template_part_cache is not None:
         return _layout_template_part_cache
     try:
-        if not _LAYOUT_TEMPLATE_PATH.exists():
-            print(f"Warning: Layout template not found at {_LAYOUT_TEMPLATE_PATH}")
-            return None
-        with open(_LAYOUT_TEMPLATE_PATH, "rb") as f:
-            raw = f.read()
+        raw = _LAYOUT_TEMPLATE_PATH.read_bytes()
         _layout_template_part_cache = {
             "inlineData": {
                 "mimeType": "image/jpeg",
-                "data": base64.b64encode(raw).decode("utf-8"),
+                "data": encode_base64(raw),
             }
         }
         return _layout_template_part_cache
+    except FileNotFoundError:
+        logger.warning("Layout template not found at %s", _LAYOUT_TEMPLATE_PATH)
+        return None
     except Exception as e:
-        print(f"Warning: Could not load layout template: {e}")
+        logger.warning("Could not load layout template: %s", e)
+        return None
+
+
+# Image-to-image edits don't need more than this on the longest side;
+# anything larger only inflates the upload and the model's decode time.
+_SOURCE_IMAGE_MAX_SIDE = 1536
+_WEBP_QUALITY = 85
+
+
+def _shrink_to_webp(image_bytes: bytes, max_side: int) -> bytes:
+    """Fit an image within max_side x max_side and re-encode it as WebP."""
+    img = Image.open(io.BytesIO(image_bytes))
+    if img.mode not in ("RGB", "RGBA"):
+        img = img.convert("RGBA")
+    img.thumbnail((max_side, max_side), Image.LANCZOS)
+    buf = io.BytesIO()
+    img.save(buf, format="WEBP", quality=_WEBP_QUALITY, method=4)
+    return buf.getvalue()
+
+
+# Logos and reference images are only looked at, not edited, so they get a
+# tighter cap. Smaller images pass through untouched to keep logo colors and
+# edges exact.
+_LOGO_MAX_SIDE = 1024
+
+
+def _fit_for_vision(image_bytes: bytes, mime_type: str) -> Tuple[bytes, str]:
+    """Downscale an oversized logo/reference to WebP; return (bytes, mime)."""
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as img:
+            if max(img.size) <= _LOGO_MAX_SIDE:
+                return image_bytes, mime_type
+        return _shrink_to_webp(image_bytes, _LOGO_MAX_SIDE), "image/webp"
+    except Exception:
+        return image_bytes, mime_type
+
+
+def _encode_for_vision(image_bytes: bytes, mime_type: str) -> Tuple[str, str]:
+    """_fit_for_vision, then base64-encode; return (data, mime)."""
+    image_bytes, mime_type = _fit_for_vision(image_bytes, mime_type)
+    return encode_base64(image_bytes), mime_type
+
+
+# Encoded logo/reference parts. The same brand logos and reference hats are
+# sent with every design and mockup for a brand; stored objects are
+# write-once, so the path is a stable key and repeats skip the read, resize
+# and encode.
+_INLINE_PART_CACHE_MAX = 256
+_inline_part_cache: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+
+
+async def _load_inline_image(path: str, mime_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Read a stored image as an inlineData part. Returns None if it's missing."""
+    key = (path, mime_type or image_mime_type(path))
+    part = _inline_part_cache.get(key)
+    if part is not None:
+        _inline_part_cache.move_to_end(key)
+        return part
+
+    raw = await read_file_bytes(path)
+    if not raw:
         return None
+    data, mime_type = await asyncio.to_thread(_encode_for_vision, raw, key[1])
+    part = {"inlineData": {"mimeType": mime_type, "data": data}}
+    _inline_part_cache[key] = part
+    if len(_inline_part_cache) > _INLINE_PART_CACHE_MAX:
+        _inline_part_cache.popitem(last=False)
+    return part
+
+
+# Gemini Files API uploads, keyed by (api_key, path) -> (fileData part,
+# expiry). Once a logo or reference hat is uploaded, later requests send a
+# short URI instead of re-inlining the image as base64. Files are scoped to
+# the uploading key's project and expire after 48h, so entries are dropped
+# a couple of hours early. Vertex AI has no equivalent endpoint (it takes
+# gs:// URIs), so Vertex requests keep sending inline data. Bounded like the
+# inline cache so one-off paths don't accumulate for the process lifetime.
+_FILES_UPLOAD_URL = "https://generativelanguage.googleapis.com/upload/v1beta/files"
+_FILE_URI_TTL_SECONDS = 46 * 3600
+_FILE_PART_CACHE_MAX = 256
+_file_part_cache: "OrderedDict[Tuple[str, str], Tuple[Dict[str, Any], float]]" = OrderedDict()
+
+
+async def _upload_to_files_api(data: bytes, mime_type: str, api_key: str) -> str:
+    """Upload bytes to the Gemini Files API and return the file URI."""
+    client = await _get_http_client()
+    response = await client.post(
+        _FILES_UPLOAD_URL,
+        params={"key": api_key},
+        content=data,
+        headers={"X-Goog-Upload-Protocol": "raw", "Content-Type": mime_type},
+    )
+    response.raise_for_status()
+    return orjson.loads(response.content)["file"]["uri"]
+
+
+async def _load_image_part(
+    path: str,
+    mime_type: Optional[str] = None,
+    *,
+    api_key: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Load a stored image as a request part, uploading it once via the Files API.
+
+    Falls back to an inlineData part under Vertex AI, without an API key, or
+    if the upload fails. Returns None if the image is missing.
+    """
+    key = api_key or settings.google_gemini_api_key
+    if _use_vertex_ai() or not key:
+        return await _load_inline_image(path, mime_type)
+
+    mime_type = mime_type or image_mime_type(path)
+    cache_key = (key, path)
+    cached = _file_part_cache.get(cache_key)
+    if cached is not None:
+        if cached[1] > time.time():
+            _file_part_cache.move_to_end(cache_key)
+            return cached[0]
+        del _file_part_cache[cache_key]
+
+    data = await read_file_bytes(path)
+    if not data:
+        return None
+    data, mime_type = await asyncio.to_thread(_fit_for_vision, data, mime_type)
+    try:
+        uri = await _upload_to_files_api(data, mime_type, key)
+    except Exception as e:
+        logger.warning("[ImageGen] Files API upload failed for %s, sending inline: %s", path, e)
+        return {"inlineData": {"mimeType": mime_type, "data": await asyncio.to_thread(encode_base64, data)}}
+
+    part = {"fileData": {"mimeType": mime_type, "fileUri": uri}}
+    _file_part_cache[cache_key] = (part, time.time() + _FILE_URI_TTL_SECONDS)
+    if len(_file_part_cache) > _FILE_PART_CACHE_MAX:
+        _file_part_cache.popitem(last=False)
+    return part
+
+
+# Encoded source images for revision rounds, where the same image is sent
+# again with only the notes changing. Stored objects are write-once (every
+# upload and generated version gets its own key), so the path identifies
+# the content without a stat — which R2 couldn't offer anyway.
+_IMAGE_PART_CACHE_MAX = 16
+_image_part_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+
+async def _get_source_image_part(image_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the inlineData part for a stored source image.
+
+    The image is downscaled to _SOURCE_IMAGE_MAX_SIDE and sent as WebP;
+    the resize and encode happen once per path.
+    """
+    part = _image_part_cache.get(image_path)
+    if part is not None:
+        _image_part_cache.move_to_end(image_path)
+        return part
+
+    image_bytes = await read_file_bytes(image_path)
+    if not image_bytes:
+        return None
+    webp_bytes = await asyncio.to_thread(_shrink_to_webp, image_bytes, _SOURCE_IMAGE_MAX_SIDE)
+    part = {"inlineData": {"mimeType": "image/webp", "data": encode_base64(webp_bytes)}}
+
+    _image_part_cache[image_path] = part
+    if len(_image_part_cache) > _IMAGE_PART_CACHE_MAX:
+        _image_part_cache.popitem(last=False)
+    return part
 
 
 _LAYOUT_TEMPLATE_LABEL = (
@@ -61,11 +244,155 @@ _LAYOUT_TEMPLATE_LABEL = (
     "layout and the angle labels."
 )
 
-# Retry configuration for 503 errors
+# Retry configuration for overloaded (503) and rate-limited (429) responses
 MAX_RETRIES = 5
 RETRY_DELAY_SECONDS = 5
+MAX_RETRY_DELAY_SECONDS = 30.0
+RETRYABLE_STATUS_CODES = {429, 503}
 IMAGE_GENERATION_TIMEOUT = 300.0  # 5 minutes for image generation
 
+def _retry_delay(attempt: int, response: httpx.Response) -> float:
+    """
+    Seconds to wait before retrying a 429/503.
+
+    Honors a numeric Retry-After header; otherwise exponential backoff with
+    full jitter (uniform over [0, cap]) so concurrent callers spread out
+    instead of retrying in waves.
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY_SECONDS, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form — fall back to computed backoff
+    return random.uniform(0, min(MAX_RETRY_DELAY_SECONDS, RETRY_DELAY_SECONDS * (2 ** attempt)))
+
+
+class TokenBucket:
+    """
+    Async token-bucket limiter: `rate` tokens per second, up to `burst` banked.
+
+    Waiters queue on the lock, so they're released in arrival order. A
+    non-positive rate disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# Paces outbound image requests to the project's quota so bursts are
+# smoothed locally instead of coming back as 429/503s that burn retries.
+_GEMINI_BUCKET = TokenBucket(rate=settings.gemini_rps, burst=settings.gemini_burst)
+
+# Caps in-flight image generation requests so a burst of designs fans out
+# without tripping the provider's concurrency limits.
+_GEMINI_SEM = asyncio.Semaphore(settings.gemini_max_concurrency or 8)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `fail_max` failures in a row the circuit opens and calls are
+    refused for `reset_timeout` seconds. It then goes half-open: the first
+    caller is let through as a trial while everyone else is still refused.
+    A success closes the circuit; a failure reopens it for another
+    `reset_timeout`. A trial that never reports back (e.g. cancelled) is
+    given up on after `reset_timeout` and a new one is admitted.
+    """
+
+    def __init__(self, fail_max: int, reset_timeout: float):
+        self.fail_max = max(1, fail_max)
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_started_at: Optional[float] = None
+
+    def allow(self) -> bool:
+        if self._opened_at is None:
+            return True
+        now = time.monotonic()
+        if now - self._opened_at < self.reset_timeout:
+            return False
+        if self._trial_started_at is not None and now - self._trial_started_at < self.reset_timeout:
+            return False
+        self._trial_started_at = now
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started_at = None
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = time.monotonic()
+            self._trial_started_at = None
+
+
+# Sheds image requests during a sustained Gemini outage so callers fail fast
+# instead of each sitting through a full retry schedule.
+_GEMINI_BREAKER = CircuitBreaker(
+    fail_max=settings.gemini_breaker_fail_max,
+    reset_timeout=settings.gemini_breaker_reset_seconds,
+)
+
+
+# Shared HTTP client for image generation calls. Reusing one pooled client
+# keeps connections to the Gemini/Vertex endpoints alive between requests
+# instead of paying a fresh TCP+TLS handshake per generation.
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_lock = asyncio.Lock()
+
+try:
+    # HTTP/2 lets concurrent generations and retries multiplex over one
+    # connection; httpx only supports it when the h2 extra is installed.
+    import h2  # noqa: F401
+    _HTTP2_ENABLED = True
+except ImportError:
+    _HTTP2_ENABLED = False
+
+
+async def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        async with _http_client_lock:
+            if _http_client is None or _http_client.is_closed:
+                _http_client = httpx.AsyncClient(
+                    http2=_HTTP2_ENABLED,
+                    timeout=httpx.Timeout(IMAGE_GENERATION_TIMEOUT, connect=10.0),
+                    limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+                )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared client. Called from the app's shutdown hook."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
 # --- Vertex AI auth helpers ---
 
 _vertex_credentials = None
@@ -91,7 +418,7 @@ def _get_vertex_credentials():
         )
         return _vertex_credentials
     except Exception as e:
-        print(f"Warning: Failed to load Vertex AI credentials: {e}")
+        logger.warning("Failed to load Vertex AI credentials: %s", e)
         return None
 
 
@@ -131,25 +458,43 @@ def _get_image_gen_url(api_key: Optional[str] = None) -> tuple[str, dict]:
                     "Content-Type": "application/json",
                     "Authorization": f"Bearer {token}",
                 }
-                print(f"[ImageGen] Using Vertex AI (project: {project})")
+                logger.debug("[ImageGen] Using Vertex AI (project: %s)", project)
                 return url, headers
             else:
-                print("[ImageGen] WARNING: Vertex AI configured but failed to get access token, falling back to direct API")
+                logger.warning("[ImageGen] Vertex AI configured but failed to get access token, falling back to direct API")
         except Exception as e:
-            print(f"[ImageGen] WARNING: Vertex AI auth error: {e}, falling back to direct API")
+            logger.warning("[ImageGen] Vertex AI auth error: %s, falling back to direct API", e)
 
     # Fallback to direct Gemini API
     key = api_key or settings.google_gemini_api_key
     url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-3.1-flash-image-preview:generateContent?key={key}"
     headers = {"Content-Type": "application/json"}
-    print(f"[ImageGen] Using direct Gemini API (key present: {bool(key)})")
+    logger.debug("[ImageGen] Using direct Gemini API (key present: %s)", bool(key))
     return url, headers
 
 
+_gemini_initialized = False
+_FLASH_MODEL_NAME = "gemini-flash-latest"
+_flash_model: Optional[genai.GenerativeModel] = None
+
+
 def init_gemini():
-    """Initialize the Gemini client."""
+    """Initialize the Gemini client (configures the SDK once per process)."""
+    global _gemini_initialized
+    if _gemini_initialized:
+        return
     if settings.google_gemini_api_key:
         genai.configure(api_key=settings.google_gemini_api_key)
+        _gemini_initialized = True
+
+
+def _get_flash_model() -> genai.GenerativeModel:
+    """Return the shared text model, building it on first use."""
+    global _flash_model
+    if _flash_model is None:
+        init_gemini()
+        _flash_model = genai.GenerativeModel(_FLASH_MODEL_NAME)
+    return _flash_model
 
 
 async def _call_gemini_text(prompt: str, image_parts: Optional[List[Dict]] = None) -> str:
@@ -158,8 +503,7 @@ async def _call_gemini_text(prompt: str, image_parts: Optional[List[Dict]] = Non
     Image generation uses Vertex AI separately; text tasks use AI Studio because
     paid-tier AI Studio has higher RPM than a fresh Vertex project's default quotas.
     """
-    init_gemini()
-    model = genai.GenerativeModel("gemini-flash-latest")
+    model = _get_flash_model()
     if image_parts:
         sdk_parts = []
         for p in image_parts:
@@ -171,9 +515,9 @@ async def _call_gemini_text(prompt: str, image_parts: Optional[List[Dict]] = Non
                     }
                 })
         sdk_parts.append(prompt)
-        response = model.generate_content(sdk_parts)
+        response = await asyncio.to_thread(model.generate_content, sdk_parts)
     else:
-        response = model.generate_content(prompt)
+        response = await asyncio.to_thread(model.generate_content, prompt)
     return response.text
 
 
@@ -216,17 +560,7 @@ Return ONLY the JSON object, no other text."""
         }
 
         raw_text = await _call_gemini_text(prompt, image_parts=[image_part])
-        response_text = raw_text.strip()
-
-        # Clean markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-
-        result = json.loads(response_text.strip())
+        result = orjson.loads(_strip_code_fence(raw_text))
 
         # Normalize location keys to lowercase
         normalized = {}
@@ -247,11 +581,11 @@ Return ONLY the JSON object, no other text."""
             if key not in normalized:
                 normalized[key] = method
 
-        print(f"[DecorationExtract] Detected: {normalized}")
+        logger.info("[DecorationExtract] Detected: %s", normalized)
         return normalized
 
     except Exception as e:
-        print(f"[DecorationExtract] Failed to extract decorations: {e}")
+        logger.warning("[DecorationExtract] Failed to extract decorations: %s", e)
         return None
 
 
@@ -351,24 +685,16 @@ async def _fetch_url_brand_assets(brand_url: str) -> Dict[str, Any]:
                         return None
                     mime = img_resp.headers.get("content-type", "").split(";")[0].strip()
                     if not mime.startswith("image/"):
-                        # Guess from extension
-                        lower = img_url.lower()
-                        if lower.endswith(".png"):
-                            mime = "image/png"
-                        elif lower.endswith((".jpg", ".jpeg")):
-                            mime = "image/jpeg"
-                        elif lower.endswith(".webp"):
-                            mime = "image/webp"
-                        elif lower.endswith(".ico"):
-                            mime = "image/x-icon"
-                        else:
+                        # Guess from extension (ICO and anything else unknown is skipped)
+                        mime = IMAGE_MIME_BY_SUFFIX.get(Path(img_url).suffix.lower())
+                        if mime is None:
                             return None
                     # Gemini doesn't accept ICO — skip those
                     if mime in ("image/x-icon", "image/vnd.microsoft.icon"):
                         return None
                     return {
                         "mime": mime,
-                        "data": base64.b64encode(img_bytes).decode("utf-8"),
+                        "data": encode_base64(img_bytes),
                     }
                 except Exception:
                     return None
@@ -381,7 +707,7 @@ async def _fetch_url_brand_assets(brand_url: str) -> Dict[str, Any]:
                 result["favicon"] = favicon
 
     except Exception as e:
-        print(f"[BrandScrape] URL fetch failed for {normalized}: {e}")
+        logger.warning("[BrandScrape] URL fetch failed for %s: %s", normalized, e)
 
     return result
 
@@ -435,10 +761,137 @@ def _kmeans_colors_from_logo(logo_bytes: bytes) -> List[str]:
                 break
         return hexes
     except Exception as e:
-        print(f"[BrandScrape] Logo k-means failed: {e}")
+        logger.warning("[BrandScrape] Logo k-means failed: %s", e)
         return []
 
 
+# Brand scrape results keyed by normalized inputs. The same brands come up
+# again and again across sessions; each fresh analysis costs seconds and tokens.
+_BRAND_CACHE_TTL_SECONDS = 24 * 60 * 60
+_BRAND_CACHE_MAX_ENTRIES = 512
+_brand_cache: Dict[str, tuple] = {}  # key -> (expires_at, result)
+
+
+def _brand_cache_key(
+    brand_name: Optional[str],
+    brand_url: Optional[str],
+    logo_bytes: Optional[bytes],
+) -> str:
+    """Hash of the lowercased name/URL plus the logo, which also drives the palette."""
+    digest = hashlib.sha256()
+    digest.update((brand_name or "").strip().lower().encode("utf-8"))
+    digest.update(b"|")
+    digest.update(_normalize_url(brand_url or "").lower().rstrip("/").encode("utf-8"))
+    digest.update(b"|")
+    if logo_bytes:
+        digest.update(logo_bytes)
+    return digest.hexdigest()
+
+
+def _brand_cache_get(key: str) -> Optional[Dict[str, Any]]:
+    entry = _brand_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, result = entry
+    if expires_at <= time.monotonic():
+        _brand_cache.pop(key, None)
+        return None
+    return copy.deepcopy(result)
+
+
+def _brand_cache_set(key: str, result: Dict[str, Any]) -> None:
+    if len(_brand_cache) >= _BRAND_CACHE_MAX_ENTRIES:
+        # Evict the oldest insertion (dicts keep insertion order).
+        _brand_cache.pop(next(iter(_brand_cache)), None)
+    _brand_cache[key] = (time.monotonic() + _BRAND_CACHE_TTL_SECONDS, copy.deepcopy(result))
+
+
+class _BrandInfo(BaseModel):
+    """Shape of the brand-analysis reply, decoded and validated in one pass.
+
+    Missing or null fields take their defaults and non-string list entries
+    are dropped; keys outside the schema pass through untouched.
+    """
+    primary_colors: List[str] = []
+    secondary_colors: List[str] = []
+    brand_style: str = ""
+    typography: str = ""
+    design_aesthetic: str = ""
+    target_audience: str = ""
+    industry: str = ""
+    brand_elements: List[str] = []
+    recommendations: str = ""
+
+    class Config:
+        extra = "allow"
+
+    @field_validator("primary_colors", "secondary_colors", "brand_elements", mode="before")
+    @classmethod
+    def _string_items(cls, v):
+        if not isinstance(v, list):
+            return []
+        return [x for x in v if isinstance(x, str)]
+
+    @field_validator(
+        "brand_style", "typography", "design_aesthetic",
+        "target_audience", "industry", "recommendations",
+        mode="before",
+    )
+    @classmethod
+    def _text_or_empty(cls, v):
+        return v if isinstance(v, str) else ("" if v is None else str(v))
+
+
+# Static pieces of the brand-analysis prompt, joined once at import; only
+# the brand name/URL, page metadata and logo colors vary per call.
+_BRAND_PROMPT_HEADER = "\n".join([
+    "You are extracting brand identity signals for hat design.",
+    "",
+    "Brand name: %s",
+    "Brand website: %s",
+])
+
+_BRAND_PROMPT_LOGO_RULES = "\n".join([
+    "",
+    "CONFIRMED PRIMARY COLORS (sampled from the logo's pixels — these are anchors, not the full palette):",
+    "  %s",
+    "",
+    "YOUR JOB — EXPAND BEYOND THESE:",
+    "- Treat the logo colors above as ONE anchor in the palette, not the full story.",
+    "- Identify ADDITIONAL brand colors that complement them: accent colors used in the brand's marketing, signature secondary colors, alternate logo variants, brand guideline palette colors you've seen for this brand.",
+    "- Sources to consult: the attached website images, your training knowledge of this brand's identity, common variations of the brand mark.",
+    "- Put these additional colors in secondary_colors. Aim for 2-4 entries when signals exist.",
+    "- DO NOT duplicate the logo colors in secondary_colors.",
+    "- DO NOT include generic UI neutrals (#FFFFFF, #000000, plain grays) unless they're explicitly part of the brand identity.",
+    "- DO NOT include CTA button colors or generic website chrome unless they clearly are brand colors.",
+])
+
+_BRAND_PROMPT_COLOR_RULES = "\n".join([
+    "",
+    "PRIMARY COLOR RULES:",
+    "- Pull primary colors from the most prominent visual mark (logo/wordmark) in the attached images.",
+    "- DO NOT pull primary colors from CTAs, buttons, background neutrals (#FFFFFF, #000000, light grays), or generic UI accent colors unless they clearly are the brand color.",
+    "- For secondary_colors, include accent colors used in marketing materials, alternate logo variants, or brand palette colors you know from training. 1-3 entries when signals exist.",
+    "- If signals are weak, prefer fewer colors over guessing.",
+])
+
+_BRAND_PROMPT_SCHEMA = "\n".join([
+    "",
+    "Respond with ONLY a JSON object — no prose, no markdown fences:",
+    "{",
+    '  "primary_colors": ["#RRGGBB", ...],          // 1-3 entries',
+    '  "secondary_colors": ["#RRGGBB", ...],        // up to 4 entries — the full brand palette beyond the primaries',
+    '  "brand_style": "...",                         // short phrase, e.g. "modern athletic"',
+    '  "typography": "...",                          // recommended font style',
+    '  "design_aesthetic": "...",                    // minimalist / bold / etc.',
+    '  "target_audience": "...",',
+    '  "industry": "...",',
+    '  "brand_elements": ["..."],',
+    '  "recommendations": "..."                      // 1-2 sentences for hat design',
+    "}",
+])
+
+
 async def scrape_brand_info(
     brand_name: Optional[str] = None,
     brand_url: Optional[str] = None,
@@ -458,8 +911,13 @@ async def scrape_brand_info(
       {primary_colors, secondary_colors, brand_style, design_aesthetic,
        typography, target_audience, industry, brand_elements,
        recommendations, color_sources}
+
+    Successful analyses are cached per (brand name, URL, logo) for a day.
     """
-    init_gemini()
+    cache_key = _brand_cache_key(brand_name, brand_url, logo_bytes)
+    cached = _brand_cache_get(cache_key)
+    if cached is not None:
+        return cached
 
     # 1. Logo k-means (authoritative primaries if logo provided)
     logo_hexes: List[str] = []
@@ -479,7 +937,7 @@ async def scrape_brand_info(
         mime = logo_mime or "image/png"
         image_parts.append({"inlineData": {
             "mimeType": mime,
-            "data": base64.b64encode(logo_bytes).decode("utf-8"),
+            "data": encode_base64(logo_bytes),
         }})
         image_labels.append("brand logo (authoritative source for primary colors)")
 
@@ -499,10 +957,7 @@ async def scrape_brand_info(
 
     # Build the text prompt
     prompt_lines = [
-        "You are extracting brand identity signals for hat design.",
-        "",
-        f"Brand name: {brand_name or 'Not provided'}",
-        f"Brand website: {brand_url or 'Not provided'}",
+        _BRAND_PROMPT_HEADER % (brand_name or "Not provided", brand_url or "Not provided"),
     ]
     if page_assets.get("title"):
         prompt_lines.append(f"Page title: {page_assets['title']}")
@@ -518,62 +973,20 @@ async def scrape_brand_info(
             prompt_lines.append(f"  {idx}. {label}")
 
     if logo_hexes:
-        prompt_lines.extend([
-            "",
-            "CONFIRMED PRIMARY COLORS (sampled from the logo's pixels — these are anchors, not the full palette):",
-            "  " + ", ".join(logo_hexes[:5]),
-            "",
-            "YOUR JOB — EXPAND BEYOND THESE:",
-            "- Treat the logo colors above as ONE anchor in the palette, not the full story.",
-            "- Identify ADDITIONAL brand colors that complement them: accent colors used in the brand's marketing, signature secondary colors, alternate logo variants, brand guideline palette colors you've seen for this brand.",
-            "- Sources to consult: the attached website images, your training knowledge of this brand's identity, common variations of the brand mark.",
-            "- Put these additional colors in secondary_colors. Aim for 2-4 entries when signals exist.",
-            "- DO NOT duplicate the logo colors in secondary_colors.",
-            "- DO NOT include generic UI neutrals (#FFFFFF, #000000, plain grays) unless they're explicitly part of the brand identity.",
-            "- DO NOT include CTA button colors or generic website chrome unless they clearly are brand colors.",
-        ])
+        prompt_lines.append(_BRAND_PROMPT_LOGO_RULES % ", ".join(logo_hexes[:5]))
     else:
-        prompt_lines.extend([
-            "",
-            "PRIMARY COLOR RULES:",
-            "- Pull primary colors from the most prominent visual mark (logo/wordmark) in the attached images.",
-            "- DO NOT pull primary colors from CTAs, buttons, background neutrals (#FFFFFF, #000000, light grays), or generic UI accent colors unless they clearly are the brand color.",
-            "- For secondary_colors, include accent colors used in marketing materials, alternate logo variants, or brand palette colors you know from training. 1-3 entries when signals exist.",
-            "- If signals are weak, prefer fewer colors over guessing.",
-        ])
-
-    prompt_lines.extend([
-        "",
-        "Respond with ONLY a JSON object — no prose, no markdown fences:",
-        "{",
-        '  "primary_colors": ["#RRGGBB", ...],          // 1-3 entries',
-        '  "secondary_colors": ["#RRGGBB", ...],        // up to 4 entries — the full brand palette beyond the primaries',
-        '  "brand_style": "...",                         // short phrase, e.g. "modern athletic"',
-        '  "typography": "...",                          // recommended font style',
-        '  "design_aesthetic": "...",                    // minimalist / bold / etc.',
-        '  "target_audience": "...",',
-        '  "industry": "...",',
-        '  "brand_elements": ["..."],',
-        '  "recommendations": "..."                      // 1-2 sentences for hat design',
-        "}",
-    ])
+        prompt_lines.append(_BRAND_PROMPT_COLOR_RULES)
+
+    prompt_lines.append(_BRAND_PROMPT_SCHEMA)
 
     prompt = "\n".join(prompt_lines)
 
     try:
         raw_text = await _call_gemini_text(prompt, image_parts=image_parts or None)
 
-        response_text = raw_text.strip()
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        if response_text.startswith("```"):
-            response_text = response_text[3:]
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-
         try:
-            parsed = json.loads(response_text.strip())
-        except json.JSONDecodeError:
+            parsed = _BrandInfo.model_validate_json(_strip_code_fence(raw_text)).model_dump()
+        except ValidationError:
             parsed = {
                 "raw_response": raw_text,
                 "brand_style": "Unable to parse structured response",
@@ -622,6 +1035,8 @@ async def scrape_brand_info(
                 sources.setdefault(hx.upper(), "website" if page_assets else "knowledge")
 
         parsed["color_sources"] = sources
+        if "raw_response" not in parsed:
+            _brand_cache_set(cache_key, parsed)
         return parsed
 
     except Exception as e:
@@ -641,6 +1056,144 @@ async def scrape_brand_info(
         }
 
 
+# Everything in an image request except the parts, serialized once at import.
+# Low-but-not-too-low temp keeps view consistency without making the model
+# latch onto the cartoon template style.
+_IMAGE_GEN_CONFIG_JSON = orjson.dumps({
+    "responseModalities": ["TEXT", "IMAGE"],
+    "temperature": 0.4,
+    "topP": 0.85,
+})
+
+
+def _image_request_body(parts: List[Dict[str, Any]]) -> bytes:
+    """Serialize an image-generation request around the static config bytes."""
+    return (
+        b'{"contents":[{"parts":' + orjson.dumps(parts)
+        + b'}],"generationConfig":' + _IMAGE_GEN_CONFIG_JSON + b"}"
+    )
+
+
+async def _post_with_retry(
+    body: bytes,
+    *,
+    api_key: Optional[str] = None,
+    log_prefix: str = "[ImageGen]",
+) -> httpx.Response:
+    """
+    POST a serialized image-generation request, retrying 429/503 with backoff.
+
+    Resolves the endpoint (refreshing the Vertex token on retries), holds
+    the concurrency semaphore and rate-limit token per attempt, and returns
+    the last response — still a 429/503 if every attempt was rejected or
+    the circuit breaker opened mid-retry.
+    """
+    url, auth_headers = _get_image_gen_url(api_key=api_key)
+    client = await _get_http_client()
+    start = time.monotonic()
+    for attempt in range(MAX_RETRIES):
+        logger.debug("%s Attempt %d/%d", log_prefix, attempt + 1, MAX_RETRIES)
+        # Refresh token on retries in case it expired
+        if attempt > 0 and _use_vertex_ai():
+            url, auth_headers = _get_image_gen_url(api_key=api_key)
+
+        try:
+            async with _GEMINI_SEM:
+                await _GEMINI_BUCKET.acquire()
+                response = await client.post(
+                    url,
+                    content=body,
+                    headers=auth_headers,
+                )
+        except httpx.TransportError:
+            _GEMINI_BREAKER.record_failure()
+            raise
+        logger.info("%s Response: %s (%.1fs elapsed)", log_prefix, response.status_code, time.monotonic() - start)
+
+        if response.status_code in RETRYABLE_STATUS_CODES or response.status_code >= 500:
+            _GEMINI_BREAKER.record_failure()
+        else:
+            _GEMINI_BREAKER.record_success()
+
+        if (
+            response.status_code in RETRYABLE_STATUS_CODES
+            and attempt < MAX_RETRIES - 1
+            and _GEMINI_BREAKER.allow()
+        ):
+            wait = _retry_delay(attempt, response)
+            logger.warning("%s %s - retrying in %.1fs", log_prefix, response.status_code, wait)
+            await asyncio.sleep(wait)
+            continue
+        return response
+    return response
+
+
+async def _call_gemini_image(
+    parts: List[Dict[str, Any]],
+    *,
+    api_key: Optional[str] = None,
+    log_prefix: str = "[ImageGen]",
+) -> Dict[str, Any]:
+    """
+    Send one image-generation request and pull the first image from the reply.
+
+    Owns the request body, busy/error mapping and candidate scan shared by every
+    generation path; retries live in _post_with_retry. Returns {"success": True,
+    "image_data", "mime_type"} or {"success": False, "error"}. Transport
+    errors (including httpx.TimeoutException) propagate to the caller.
+    """
+    if not _GEMINI_BREAKER.allow():
+        return {
+            "success": False,
+            "error": "The AI image generator is temporarily unavailable. Please try again shortly.",
+        }
+
+    start = time.monotonic()
+    response = await _post_with_retry(_image_request_body(parts), api_key=api_key, log_prefix=log_prefix)
+
+    if response.status_code in RETRYABLE_STATUS_CODES:
+        return {
+            "success": False,
+            "error": "The AI image generator is currently busy. Please wait a moment and try again.",
+        }
+
+    if response.status_code != 200:
+        try:
+            error_data = orjson.loads(response.content)
+        except orjson.JSONDecodeError:
+            error_data = {"error": response.text[:500]}
+        logger.error("%s Error: %s - %.200s", log_prefix, response.status_code, error_data)
+        return {
+            "success": False,
+            "error": f"API error {response.status_code}: {error_data}",
+        }
+
+    logger.info("%s Success in %.1fs", log_prefix, time.monotonic() - start)
+    result = orjson.loads(response.content)
+
+    # First inline image in the reply, stopping as soon as one is found
+    image = next(
+        (
+            part["inlineData"]
+            for candidate in result.get("candidates") or ()
+            for part in (candidate.get("content") or {}).get("parts") or ()
+            if "inlineData" in part
+        ),
+        None,
+    )
+    if image is not None:
+        return {
+            "success": True,
+            "image_data": image["data"],
+            "mime_type": image.get("mimeType", "image/png"),
+        }
+
+    return {
+        "success": False,
+        "error": f"No image in response: {str(result)[:500]}",
+    }
+
+
 async def generate_design_image(
     prompt: str,
     logo_path: Optional[str] = None,
@@ -669,8 +1222,6 @@ async def generate_design_image(
                 "error": "No image generation API configured. Set Vertex AI credentials or Gemini API key.",
             }
 
-        url, auth_headers = _get_image_gen_url()
-
         # Build parts list - include logos and/or original image
         parts = []
 
@@ -685,26 +1236,17 @@ async def generate_design_image(
         # User-supplied reference image (existing hat/design to riff on).
         # Placed BEFORE logos so the model anchors silhouette/composition first,
         # then drops the brand's logos onto that base.
-        if reference_image_path:
+        ref_ext = Path(reference_image_path).suffix.lower() if reference_image_path else None
+        if ref_ext and ref_ext not in SUPPORTED_IMAGE_EXTENSIONS:
+            logger.warning("Skipping reference image - unsupported format: %s", ref_ext)
+        elif reference_image_path:
             try:
-                ref_bytes = await read_file_bytes(reference_image_path)
-                if ref_bytes:
-                    ref_base64 = base64.b64encode(ref_bytes).decode("utf-8")
-                    ref_mime = "image/png"
-                    lower = reference_image_path.lower()
-                    if lower.endswith((".jpg", ".jpeg")):
-                        ref_mime = "image/jpeg"
-                    elif lower.endswith(".webp"):
-                        ref_mime = "image/webp"
+                ref_part = await _load_image_part(reference_image_path, IMAGE_MIME_BY_SUFFIX.get(ref_ext))
+                if ref_part:
                     parts.append({"text": "USER REFERENCE IMAGE (the existing design the user wants to reference — see the REFERENCE IMAGE section of the prompt for how strictly to follow it):"})
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": ref_mime,
-                            "data": ref_base64,
-                        }
-                    })
+                    parts.append(ref_part)
             except Exception as e:
-                print(f"Warning: Could not load reference image: {e}")
+                logger.warning("Could not load reference image: %s", e)
 
         # Multi-logo support: add each logo with a label
         if logos:
@@ -719,20 +1261,13 @@ async def generate_design_image(
                 try:
                     ext = Path(l_path).suffix.lower()
                     if ext not in SUPPORTED_IMAGE_EXTENSIONS:
-                        print(f"Warning: Skipping unsupported image format for '{l_name}': {ext}")
+                        logger.warning("Skipping unsupported image format for '%s': %s", l_name, ext)
                         continue
 
-                    logo_bytes = await read_file_bytes(l_path)
-                    if not logo_bytes:
-                        print(f"Warning: Logo file not found: {l_path}")
+                    logo_part = await _load_image_part(l_path, IMAGE_MIME_BY_SUFFIX[ext])
+                    if not logo_part:
+                        logger.warning("Logo file not found: %s", l_path)
                         continue
-                    logo_base64 = base64.b64encode(logo_bytes).decode("utf-8")
-
-                    mime_type = "image/png"
-                    if ext in {'.jpg', '.jpeg'}:
-                        mime_type = "image/jpeg"
-                    elif ext == '.webp':
-                        mime_type = "image/webp"
 
                     # Add label before the logo image
                     label = f"LOGO '{l_name}'"
@@ -741,134 +1276,38 @@ async def generate_design_image(
                     label += ":"
 
                     parts.append({"text": label})
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": mime_type,
-                            "data": logo_base64
-                        }
-                    })
+                    parts.append(logo_part)
                 except Exception as e:
-                    print(f"Warning: Could not load logo '{l_name}': {e}")
+                    logger.warning("Could not load logo '%s': %s", l_name, e)
 
         # Backward compat: single logo_path
         elif logo_path:
             try:
                 ext = Path(logo_path).suffix.lower()
                 if ext not in SUPPORTED_IMAGE_EXTENSIONS:
-                    print(f"Warning: Skipping unsupported image format: {ext}. Only PNG, JPG, and WEBP are supported.")
+                    logger.warning("Skipping unsupported image format: %s. Only PNG, JPG, and WEBP are supported.", ext)
                 else:
-                    logo_bytes = await read_file_bytes(logo_path)
-                    if logo_bytes:
-                        logo_base64 = base64.b64encode(logo_bytes).decode("utf-8")
-
-                        mime_type = "image/png"
-                        if ext in {'.jpg', '.jpeg'}:
-                            mime_type = "image/jpeg"
-                        elif ext == '.webp':
-                            mime_type = "image/webp"
-
-                        parts.append({
-                            "inlineData": {
-                                "mimeType": mime_type,
-                                "data": logo_base64
-                            }
-                        })
+                    logo_part = await _load_image_part(logo_path, IMAGE_MIME_BY_SUFFIX[ext])
+                    if logo_part:
+                        parts.append(logo_part)
             except Exception as e:
-                print(f"Warning: Could not load logo: {e}")
+                logger.warning("Could not load logo: %s", e)
 
         # If we have an original image (revision mode), include it as the
         # authoritative source. Label it so the edit prompt's references land.
         if original_image_path:
             try:
-                image_bytes = await read_file_bytes(original_image_path)
-                if image_bytes:
-                    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-                    mime_type = "image/png"
-                    if original_image_path.endswith(".jpg") or original_image_path.endswith(".jpeg"):
-                        mime_type = "image/jpeg"
+                source_part = await _get_source_image_part(original_image_path)
+                if source_part:
                     parts.append({"text": "SOURCE DESIGN (the current design — preserve everything not explicitly changed):"})
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": mime_type,
-                            "data": image_base64
-                        }
-                    })
+                    parts.append(source_part)
             except Exception as e:
-                print(f"Warning: Could not load original image: {e}")
+                logger.warning("Could not load original image: %s", e)
 
         # Add the text prompt
         parts.append({"text": prompt})
 
-        payload = {
-            "contents": [
-                {
-                    "parts": parts
-                }
-            ],
-            "generationConfig": {
-                "responseModalities": ["TEXT", "IMAGE"],
-                # Low-but-not-too-low temp keeps view consistency without making the
-                # model latch onto the cartoon template style.
-                "temperature": 0.4,
-                "topP": 0.85
-            }
-        }
-
-        import time as _time
-        async with httpx.AsyncClient(timeout=IMAGE_GENERATION_TIMEOUT) as client:
-            # Retry logic for 503 errors (model overloaded)
-            last_error = None
-            _start = _time.time()
-            for attempt in range(MAX_RETRIES):
-                print(f"[ImageGen] Attempt {attempt + 1}/{MAX_RETRIES}...")
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers=auth_headers,
-                )
-                print(f"[ImageGen] Response: {response.status_code} ({_time.time() - _start:.1f}s elapsed)")
-
-                if response.status_code == 503:
-                    last_error = "The model is overloaded. Please try again."
-                    if attempt < MAX_RETRIES - 1:
-                        wait = RETRY_DELAY_SECONDS * (attempt + 1)
-                        print(f"[ImageGen] 503 - retrying in {wait}s...")
-                        await asyncio.sleep(wait)
-                        continue
-                    return {
-                        "success": False,
-                        "error": "The AI image generator is currently busy. Please wait a moment and try again.",
-                    }
-
-                if response.status_code != 200:
-                    error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"error": response.text}
-                    print(f"[ImageGen] Error: {response.status_code} - {str(error_data)[:200]}")
-                    return {
-                        "success": False,
-                        "error": f"API error {response.status_code}: {error_data}",
-                    }
-
-                break  # Success, exit retry loop
-
-            print(f"[ImageGen] Success in {_time.time() - _start:.1f}s")
-            result = response.json()
-
-            # Extract image from response
-            if "candidates" in result and len(result["candidates"]) > 0:
-                candidate = result["candidates"][0]
-                if "content" in candidate and "parts" in candidate["content"]:
-                    for part in candidate["content"]["parts"]:
-                        if "inlineData" in part:
-                            return {
-                                "success": True,
-                                "image_data": part["inlineData"]["data"],
-                                "mime_type": part["inlineData"].get("mimeType", "image/png"),
-                            }
-
-            return {
-                "success": False,
-                "error": f"No image in response: {result}",
-            }
+        return await _call_gemini_image(parts)
 
     except httpx.TimeoutException:
         return {
@@ -951,6 +1390,24 @@ async def generate_design(
     }
 
 
+async def generate_designs_batch(requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Generate several designs concurrently.
+
+    Each entry holds generate_design keyword arguments. Calls fan out
+    together; _GEMINI_SEM bounds how many hit the API at once. Results come
+    back in request order, with failures reported as error dicts.
+    """
+    results = await asyncio.gather(
+        *(generate_design(**r) for r in requests),
+        return_exceptions=True,
+    )
+    return [
+        {"success": False, "error": str(r)} if isinstance(r, Exception) else r
+        for r in results
+    ]
+
+
 async def generate_revision_v2(
     base_prompt: str,
     edit_notes: str,
@@ -1062,6 +1519,17 @@ matching the layout template.
     }
 
 
+# Focused edit prompt for single-image revisions; only the notes vary.
+_REVISION_PROMPT_TMPL = (
+    "Edit this hat design image. Make ONLY the following change:\n"
+    "\n"
+    "%s\n"
+    "\n"
+    "IMPORTANT: Keep everything else exactly the same. Only modify what is specifically requested above. "
+    "Maintain all other design elements, colors, decorations, and styling unchanged."
+)
+
+
 async def generate_revision(
     original_prompt: str,
     revision_notes: str,
@@ -1094,104 +1562,25 @@ async def generate_revision(
                 "error": "No image generation API configured. Set Vertex AI credentials or Gemini API key.",
             }
 
-        url, auth_headers = _get_image_gen_url()
-
         # Build parts - include the latest image first, then the edit instruction
         parts = []
 
         # Load and include the latest generated image
         if original_image_path:
             try:
-                image_bytes = await read_file_bytes(original_image_path)
-                if image_bytes:
-                    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-                    mime_type = "image/png"
-                    if original_image_path.endswith((".jpg", ".jpeg")):
-                        mime_type = "image/jpeg"
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": mime_type,
-                            "data": image_base64
-                        }
-                    })
+                source_part = await _get_source_image_part(original_image_path)
+                if source_part:
+                    parts.append(source_part)
             except Exception as e:
-                print(f"Warning: Could not load image: {e}")
+                logger.warning("Could not load image: %s", e)
 
         # Create a focused edit prompt that emphasizes minimal changes
-        edit_prompt = f"""Edit this hat design image. Make ONLY the following change:
-
-{revision_notes}
-
-IMPORTANT: Keep everything else exactly the same. Only modify what is specifically requested above. Maintain all other design elements, colors, decorations, and styling unchanged."""
+        edit_prompt = _REVISION_PROMPT_TMPL % revision_notes
 
         parts.append({"text": edit_prompt})
 
-        payload = {
-            "contents": [{"parts": parts}],
-            "generationConfig": {
-                "responseModalities": ["TEXT", "IMAGE"],
-                # Low-but-not-too-low temp keeps view consistency without making the
-                # model latch onto the cartoon template style.
-                "temperature": 0.4,
-                "topP": 0.85
-            }
-        }
-
-        async with httpx.AsyncClient(timeout=IMAGE_GENERATION_TIMEOUT) as client:
-            # Retry logic for 503 errors (model overloaded)
-            last_error = None
-            for attempt in range(MAX_RETRIES):
-                # Refresh token on retries in case it expired
-                if attempt > 0 and _use_vertex_ai():
-                    url, auth_headers = _get_image_gen_url()
-
-                response = await client.post(
-                    url,
-                    json=payload,
-                    headers=auth_headers,
-                )
-
-                if response.status_code == 503:
-                    last_error = "The model is overloaded. Please try again."
-                    if attempt < MAX_RETRIES - 1:
-                        await asyncio.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
-                        continue
-                    return {
-                        "success": False,
-                        "prompt": revision_notes,
-                        "error": "The AI image generator is currently busy. Please wait a moment and try again.",
-                    }
-
-                if response.status_code != 200:
-                    error_data = response.json() if response.headers.get("content-type", "").startswith("application/json") else {"error": response.text}
-                    return {
-                        "success": False,
-                        "prompt": revision_notes,
-                        "error": f"API error {response.status_code}: {error_data}",
-                    }
-
-                break  # Success, exit retry loop
-
-            result = response.json()
-
-            # Extract image from response
-            if "candidates" in result and len(result["candidates"]) > 0:
-                candidate = result["candidates"][0]
-                if "content" in candidate and "parts" in candidate["content"]:
-                    for part in candidate["content"]["parts"]:
-                        if "inlineData" in part:
-                            return {
-                                "success": True,
-                                "prompt": revision_notes,
-                                "image_data": part["inlineData"]["data"],
-                                "mime_type": part["inlineData"].get("mimeType", "image/png"),
-                            }
-
-            return {
-                "success": False,
-                "prompt": revision_notes,
-                "error": f"No image in response: {result}",
-            }
+        result = await _call_gemini_image(parts)
+        return {"prompt": revision_notes, **result}
 
     except httpx.TimeoutException:
         return {
@@ -1240,6 +1629,7 @@ async def generate_custom_design(
     Returns:
         Dictionary with prompt, success status, and image data or error
     """
+    prompt = ""
     try:
         if not _use_vertex_ai() and not (settings.google_gemini_api_key_mockup or settings.google_gemini_api_key):
             return {
@@ -1262,7 +1652,6 @@ async def generate_custom_design(
 
         # Use mockup-specific API key for fallback if Vertex AI not configured
         fallback_key = settings.google_gemini_api_key_mockup or settings.google_gemini_api_key
-        url, auth_headers = _get_image_gen_url(api_key=fallback_key)
 
         # Build parts list - include all location logos and reference hat
         parts = []
@@ -1273,156 +1662,71 @@ async def generate_custom_design(
             parts.append({"text": _LAYOUT_TEMPLATE_LABEL})
             parts.append(template_part)
 
-        # Add reference hat image if provided
-        if reference_hat_path:
-            try:
-                image_bytes = await read_file_bytes(reference_hat_path)
-                if image_bytes:
-                    image_base64 = base64.b64encode(image_bytes).decode("utf-8")
-                    mime_type = "image/png"
-                    if reference_hat_path.lower().endswith((".jpg", ".jpeg")):
-                        mime_type = "image/jpeg"
-                    parts.append({"text": "REFERENCE HAT IMAGE:"})
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": mime_type,
-                            "data": image_base64
-                        }
-                    })
-            except Exception as e:
-                print(f"Warning: Could not load reference hat: {e}")
+        # Reference hat first, then one labeled image per location logo.
+        # All reads are independent, so they're loaded concurrently and
+        # appended in this order afterwards.
+        image_loads = []  # (label, warning_context, coroutine)
+        ref_ext = Path(reference_hat_path).suffix.lower() if reference_hat_path else None
+        if ref_ext and ref_ext not in SUPPORTED_IMAGE_EXTENSIONS:
+            logger.warning("[Mockup Builder] Skipping reference hat - unsupported format: %s", ref_ext)
+        elif reference_hat_path:
+            image_loads.append((
+                "REFERENCE HAT IMAGE:",
+                "reference hat",
+                _load_image_part(reference_hat_path, IMAGE_MIME_BY_SUFFIX.get(ref_ext), api_key=fallback_key),
+            ))
 
-        # Add each location logo
         for logo_info in location_logos:
             logo_path = logo_info.get("logo_path")
             location = logo_info.get("location", "unknown")
 
             if logo_path:
-                try:
-                    ext = Path(logo_path).suffix.lower()
-                    if ext not in SUPPORTED_IMAGE_EXTENSIONS:
-                        print(f"Warning: Skipping {location} logo - unsupported format: {ext}. Only PNG, JPG, and WEBP are supported.")
-                        continue
-
-                    logo_bytes = await read_file_bytes(logo_path)
-                    if not logo_bytes:
-                        print(f"Warning: {location} logo not found: {logo_path}")
-                        continue
-                    logo_base64 = base64.b64encode(logo_bytes).decode("utf-8")
-
-                    mime_type = "image/png"
-                    if ext in {'.jpg', '.jpeg'}:
-                        mime_type = "image/jpeg"
-                    elif ext == '.webp':
-                        mime_type = "image/webp"
-
-                    parts.append({"text": f"LOGO FOR {location.upper()} LOCATION:"})
-                    parts.append({
-                        "inlineData": {
-                            "mimeType": mime_type,
-                            "data": logo_base64
-                        }
-                    })
-                except Exception as e:
-                    print(f"Warning: Could not load {location} logo: {e}")
+                ext = Path(logo_path).suffix.lower()
+                if ext not in SUPPORTED_IMAGE_EXTENSIONS:
+                    logger.warning("[Mockup Builder] Skipping %s logo - unsupported format: %s. Only PNG, JPG, and WEBP are supported.", location, ext)
+                    continue
+                image_loads.append((
+                    f"LOGO FOR {location.upper()} LOCATION:",
+                    f"{location} logo",
+                    _load_image_part(logo_path, IMAGE_MIME_BY_SUFFIX[ext], api_key=fallback_key),
+                ))
+
+        loaded = await asyncio.gather(
+            *(coro for _, _, coro in image_loads),
+            return_exceptions=True,
+        )
+        for (label, context, _), image_part in zip(image_loads, loaded):
+            if isinstance(image_part, Exception):
+                logger.warning("[Mockup Builder] Could not load %s: %s", context, image_part)
+                continue
+            if not image_part:
+                logger.warning("[Mockup Builder] %s not found", context)
+                continue
+            parts.append({"text": label})
+            parts.append(image_part)
 
         # Add the text prompt at the end
         parts.append({"text": prompt})
 
-        payload = {
-            "contents": [{"parts": parts}],
-            "generationConfig": {
-                "responseModalities": ["TEXT", "IMAGE"],
-                # Low-but-not-too-low temp keeps view consistency without making the
-                # model latch onto the cartoon template style.
-                "temperature": 0.4,
-                "topP": 0.85
-            }
-        }
-
-        print(f"[Mockup Builder] Making API request ({'Vertex AI' if _use_vertex_ai() else 'direct Gemini'})...")
-        print(f"[Mockup Builder] Number of parts: {len(parts)}")
-
-        async with httpx.AsyncClient(timeout=IMAGE_GENERATION_TIMEOUT) as client:
-            # Retry logic for 503 errors (model overloaded)
-            last_error = None
-            for attempt in range(MAX_RETRIES):
-                print(f"[Mockup Builder] Attempt {attempt + 1}/{MAX_RETRIES}")
-                # Refresh token on retries in case it expired
-                if attempt > 0 and _use_vertex_ai():
-                    url, auth_headers = _get_image_gen_url(api_key=fallback_key)
-                try:
-                    response = await client.post(
-                        url,
-                        json=payload,
-                        headers=auth_headers,
-                    )
-                    print(f"[Mockup Builder] Response status: {response.status_code}")
-                except Exception as req_error:
-                    print(f"[Mockup Builder] Request error: {req_error}")
-                    raise
-
-                if response.status_code == 503:
-                    last_error = "The model is overloaded. Please try again."
-                    print(f"[Mockup Builder] 503 error - model overloaded")
-                    if attempt < MAX_RETRIES - 1:
-                        await asyncio.sleep(RETRY_DELAY_SECONDS * (attempt + 1))
-                        continue
-                    return {
-                        "success": False,
-                        "prompt": prompt,
-                        "error": "The AI image generator is currently busy. Please wait a moment and try again.",
-                    }
-
-                if response.status_code != 200:
-                    try:
-                        error_data = response.json()
-                    except Exception:
-                        error_data = {"error": response.text[:500]}
-                    print(f"[Mockup Builder] API error {response.status_code}: {error_data}")
-                    return {
-                        "success": False,
-                        "prompt": prompt,
-                        "error": f"API error {response.status_code}: {error_data}",
-                    }
-
-                break  # Success, exit retry loop
-
-            result = response.json()
-            print(f"[Mockup Builder] Got response with keys: {list(result.keys())}")
-
-            # Extract image from Gemini response
-            if "candidates" in result and len(result["candidates"]) > 0:
-                candidate = result["candidates"][0]
-                if "content" in candidate and "parts" in candidate["content"]:
-                    for part in candidate["content"]["parts"]:
-                        if "inlineData" in part:
-                            return {
-                                "success": True,
-                                "prompt": prompt,
-                                "image_data": part["inlineData"]["data"],
-                                "mime_type": part["inlineData"].get("mimeType", "image/png"),
-                            }
+        logger.debug(
+            "[Mockup Builder] Making API request (%s) with %d parts",
+            "Vertex AI" if _use_vertex_ai() else "direct Gemini", len(parts),
+        )
 
-            return {
-                "success": False,
-                "prompt": prompt,
-                "error": f"No image in response: {result}",
-            }
+        result = await _call_gemini_image(parts, api_key=fallback_key, log_prefix="[Mockup Builder]")
+        return {"prompt": prompt, **result}
 
     except httpx.TimeoutException as timeout_err:
-        print(f"[Mockup Builder] TIMEOUT after {IMAGE_GENERATION_TIMEOUT}s: {timeout_err}")
+        logger.error("[Mockup Builder] TIMEOUT after %ss: %s", IMAGE_GENERATION_TIMEOUT, timeout_err)
         return {
             "success": False,
-            "prompt": prompt if 'prompt' in dir() else "Error building prompt",
+            "prompt": prompt or "Error building prompt",
             "error": "Request timed out. Image generation may take longer than expected.",
         }
     except Exception as e:
-        print(f"[Mockup Builder] EXCEPTION: {type(e).__name__}: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("[Mockup Builder] EXCEPTION: %s: %s", type(e).__name__, e)
         return {
             "success": False,
-            "prompt": prompt if 'prompt' in dir() else "Error building prompt",
+            "prompt": prompt or "Error building prompt",
             "error": str(e),
         }
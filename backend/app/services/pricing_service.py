@@ -2,6 +2,8 @@
 Pricing service for calculating domestic and overseas quotes.
 """
 
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Optional
 from ..data.pricing import (
     DOMESTIC_QUANTITY_BREAKS,
@@ -24,15 +26,139 @@ from ..data.pricing import (
 )
 
 
+def _price_vectors(table: dict, breaks: list[int], default=None) -> dict[str, tuple]:
+    """
+    Flatten {name: {qty_break: price}} into {name: (price per break, ...)}.
+
+    Tuples are aligned with `breaks`, so quote loops index by break position
+    instead of hashing into a nested dict. Tiers an option isn't offered at
+    hold `default`.
+    """
+    return {name: tuple(prices.get(b, default) for b in breaks) for name, prices in table.items()}
+
+
+def _to_cents(dollars: float) -> int:
+    return round(dollars * 100)
+
+
+def _cents_vectors(table: dict, breaks: list[int]) -> dict[str, tuple]:
+    """_price_vectors in integer cents, for tables priced in whole cents."""
+    return {
+        name: tuple(_to_cents(price) for price in prices)
+        for name, prices in _price_vectors(table, breaks, 0).items()
+    }
+
+
+# Price tables flattened against their quantity breaks (see _price_vectors).
+# Domestic prices are all whole cents, so domestic quotes are summed in
+# integer cents and converted to dollars once per output field, with no
+# float drift to round away.
+_DOMESTIC_ZEROS = (0,) * len(DOMESTIC_QUANTITY_BREAKS)
+_DOMESTIC_BLANK_CENTS = _cents_vectors(DOMESTIC_BLANK_PRICES, DOMESTIC_QUANTITY_BREAKS)
+_DOMESTIC_FRONT_CENTS = _cents_vectors(DOMESTIC_FRONT_DECORATION_PRICES, DOMESTIC_QUANTITY_BREAKS)
+_DOMESTIC_ADDITIONAL_CENTS = _cents_vectors(DOMESTIC_ADDITIONAL_DECORATION_PRICES, DOMESTIC_QUANTITY_BREAKS)
+_DOMESTIC_DIGITIZING_CENTS = tuple(
+    _to_cents(DOMESTIC_ADDITIONAL_CHARGES["Embroidery Digitizing Fee"].get(b, 0)) for b in DOMESTIC_QUANTITY_BREAKS
+)
+_DOMESTIC_RUSH_FEE_CENTS = {speed: _to_cents(fee) for speed, fee in DOMESTIC_RUSH_FEES.items()}
+_DOMESTIC_ROPE_CENTS = _to_cents(DOMESTIC_ADDONS["Rope"])
+
+# Valid style numbers / hat types, checked before any price table is touched
+_DOMESTIC_STYLE_SET = frozenset(DOMESTIC_BLANK_PRICES)
+_OVERSEAS_HAT_SET = frozenset(OVERSEAS_HAT_TYPES)
+
+# Overseas tables carry sub-cent prices (e.g. 0.6975), so overseas quotes
+# stay in float dollars and round each output field.
+_OVERSEAS_ZEROS = (0,) * len(OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_HAT_VEC = {
+    name: tuple(info["prices"].get(b, 0) for b in OVERSEAS_QUANTITY_BREAKS)
+    for name, info in OVERSEAS_HAT_TYPES.items()
+}
+# None marks a tier the option doesn't meet MOQ at
+_OVERSEAS_FRONT_VEC = _price_vectors(OVERSEAS_FRONT_DECORATION_PRICES, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_SIDE_VEC = _price_vectors(OVERSEAS_SIDE_DECORATION_PRICES, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_BACK_VEC = _price_vectors(OVERSEAS_BACK_DECORATION_PRICES, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_VISOR_VEC = _price_vectors(OVERSEAS_VISOR_DECORATION_PRICES, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_ADDON_VEC = _price_vectors(OVERSEAS_DESIGN_ADDONS, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_ACCESSORY_VEC = _price_vectors(OVERSEAS_ACCESSORIES, OVERSEAS_QUANTITY_BREAKS)
+_OVERSEAS_SHIPPING_VEC = _price_vectors(OVERSEAS_SHIPPING, OVERSEAS_QUANTITY_BREAKS, 0)
+
+
+def _moq_masks(vectors: dict[str, tuple]) -> dict[str, int]:
+    """Bitmask per option: bit i is set when the option is offered at break i."""
+    return {
+        name: sum(1 << i for i, price in enumerate(prices) if price is not None)
+        for name, prices in vectors.items()
+    }
+
+
+def _break_sums(vectors: list[tuple], moq_mask: int, zeros: tuple) -> tuple:
+    """
+    Per-break totals of several price vectors, summed once per quote rather
+    than once per break. Breaks outside `moq_mask` hold None.
+    """
+    if not vectors:
+        return zeros
+    return tuple(
+        sum(prices) if moq_mask >> idx & 1 else None
+        for idx, prices in enumerate(zip(*vectors))
+    )
+
+
+# MOQ is checked by ANDing the masks of every selected option once per quote;
+# unselected or unknown options constrain nothing.
+_OVERSEAS_ALL_BREAKS = (1 << len(OVERSEAS_QUANTITY_BREAKS)) - 1
+_OVERSEAS_FRONT_MASK = _moq_masks(_OVERSEAS_FRONT_VEC)
+_OVERSEAS_SIDE_MASK = _moq_masks(_OVERSEAS_SIDE_VEC)
+_OVERSEAS_BACK_MASK = _moq_masks(_OVERSEAS_BACK_VEC)
+_OVERSEAS_VISOR_MASK = _moq_masks(_OVERSEAS_VISOR_VEC)
+_OVERSEAS_ADDON_MASK = _moq_masks(_OVERSEAS_ADDON_VEC)
+_OVERSEAS_ACCESSORY_MASK = _moq_masks(_OVERSEAS_ACCESSORY_VEC)
+
+# (slot, response key, price vectors, MOQ masks) per decoration location,
+# in response order.
+_OVERSEAS_DECORATION_SLOTS = (
+    ("front", "front_decoration_price", _OVERSEAS_FRONT_VEC, _OVERSEAS_FRONT_MASK),
+    ("left", "left_decoration_price", _OVERSEAS_SIDE_VEC, _OVERSEAS_SIDE_MASK),
+    ("right", "right_decoration_price", _OVERSEAS_SIDE_VEC, _OVERSEAS_SIDE_MASK),
+    ("back", "back_decoration_price", _OVERSEAS_BACK_VEC, _OVERSEAS_BACK_MASK),
+    ("visor", "visor_decoration_price", _OVERSEAS_VISOR_VEC, _OVERSEAS_VISOR_MASK),
+)
+
+# Cached quotes keep each price break as a tuple of values in this key
+# order; _copy_quote turns them into the response dicts.
+_DOMESTIC_ROW_KEYS = (
+    "quantity_break",
+    "blank_price",
+    "front_decoration_price",
+    "left_decoration_price",
+    "right_decoration_price",
+    "back_decoration_price",
+    "rush_fee",
+    "rope_price",
+    "per_piece_price",
+    "digitizing_fee",
+    "subtotal",
+    "total",
+)
+_OVERSEAS_ROW_KEYS = (
+    "quantity_break",
+    "meets_moq",
+    "blank_price",
+    *(price_key for _, price_key, _, _ in _OVERSEAS_DECORATION_SLOTS),
+    "addons_price",
+    "accessories_price",
+    "hat_subtotal",
+    "shipping_price",
+    "per_piece_price",
+    "total",
+)
+
+
 def get_quantity_break(quantity: int, breaks: list[int]) -> int:
-    """Find the applicable quantity break for a given quantity."""
-    applicable_break = breaks[0]
-    for brk in breaks:
-        if quantity >= brk:
-            applicable_break = brk
-        else:
-            break
-    return applicable_break
+    """Find the applicable quantity break for a given quantity (breaks sorted ascending)."""
+    idx = bisect_right(breaks, quantity) - 1
+    return breaks[idx] if idx >= 0 else breaks[0]
 
 
 def get_price_at_quantity(prices: dict, quantity: int, breaks: list[int]) -> float:
@@ -41,6 +167,20 @@ def get_price_at_quantity(prices: dict, quantity: int, breaks: list[int]) -> flo
     return prices.get(qty_break, 0)
 
 
+def _copy_quote(quote: dict, row_keys: tuple[str, ...]) -> dict:
+    """
+    Copy a cached quote deep enough that callers can't mutate the cache,
+    expanding its price break tuples into dicts keyed by `row_keys`.
+    Short tuples yield short dicts (see the overseas MOQ-fail rows).
+    """
+    copied = dict(quote)
+    copied["price_breaks"] = [dict(zip(row_keys, row)) for row in quote["price_breaks"]]
+    for key in ("design_addons", "accessories"):
+        if key in copied:
+            copied[key] = list(copied[key])
+    return copied
+
+
 def calculate_domestic_quote(
     style_number: str,
     front_decoration: Optional[str] = None,
@@ -58,63 +198,77 @@ def calculate_domestic_quote(
     required; matches the overseas behavior). Each row's `total` is what
     you'd pay if you ordered exactly that tier amount.
     """
-    if style_number not in DOMESTIC_BLANK_PRICES:
+    return _copy_quote(_domestic_quote_cached(
+        style_number, front_decoration, left_decoration, right_decoration,
+        back_decoration, shipping_speed, include_rope, num_dst_files,
+    ), _DOMESTIC_ROW_KEYS)
+
+
+# Quotes are pure functions of their inputs and the builders re-request the
+# same ones as users tweak unrelated fields. Cached results are shared and
+# hold price breaks as tuples, so the public wrappers hand out dict copies.
+@lru_cache(maxsize=4096)
+def _domestic_quote_cached(
+    style_number: str,
+    front_decoration: Optional[str],
+    left_decoration: Optional[str],
+    right_decoration: Optional[str],
+    back_decoration: Optional[str],
+    shipping_speed: str,
+    include_rope: bool,
+    num_dst_files: int,
+) -> dict:
+    if style_number not in _DOMESTIC_STYLE_SET:
         raise ValueError(f"Unknown style number: {style_number}")
 
     style_info = DOMESTIC_STYLES.get(style_number, {})
     results = []
 
-    for qty_break in DOMESTIC_QUANTITY_BREAKS:
-        # Base hat price
-        blank_price = DOMESTIC_BLANK_PRICES[style_number].get(qty_break, 0)
-
-        # Front decoration
-        front_deco_price = 0
-        if front_decoration and front_decoration in DOMESTIC_FRONT_DECORATION_PRICES:
-            front_deco_price = DOMESTIC_FRONT_DECORATION_PRICES[front_decoration].get(qty_break, 0)
-
-        # Additional locations
-        left_deco_price = 0
-        if left_decoration and left_decoration in DOMESTIC_ADDITIONAL_DECORATION_PRICES:
-            left_deco_price = DOMESTIC_ADDITIONAL_DECORATION_PRICES[left_decoration].get(qty_break, 0)
-
-        right_deco_price = 0
-        if right_decoration and right_decoration in DOMESTIC_ADDITIONAL_DECORATION_PRICES:
-            right_deco_price = DOMESTIC_ADDITIONAL_DECORATION_PRICES[right_decoration].get(qty_break, 0)
-
-        back_deco_price = 0
-        if back_decoration and back_decoration in DOMESTIC_ADDITIONAL_DECORATION_PRICES:
-            back_deco_price = DOMESTIC_ADDITIONAL_DECORATION_PRICES[back_decoration].get(qty_break, 0)
-
-        # Rush fee
-        rush_fee = DOMESTIC_RUSH_FEES.get(shipping_speed, 0)
-
-        # Rope add-on
-        rope_price = DOMESTIC_ADDONS["Rope"] if include_rope else 0
+    # All amounts below are integer cents
+    blank_prices = _DOMESTIC_BLANK_CENTS[style_number]
+    front_prices = _DOMESTIC_FRONT_CENTS.get(front_decoration, _DOMESTIC_ZEROS)
+    left_prices = _DOMESTIC_ADDITIONAL_CENTS.get(left_decoration, _DOMESTIC_ZEROS)
+    right_prices = _DOMESTIC_ADDITIONAL_CENTS.get(right_decoration, _DOMESTIC_ZEROS)
+    back_prices = _DOMESTIC_ADDITIONAL_CENTS.get(back_decoration, _DOMESTIC_ZEROS)
+
+    # Per-piece charges that don't vary by quantity break
+    rush_fee = _DOMESTIC_RUSH_FEE_CENTS.get(shipping_speed, 0)
+    rope_price = _DOMESTIC_ROPE_CENTS if include_rope else 0
+    rush_fee_dollars = rush_fee / 100
+    rope_price_dollars = rope_price / 100
+
+    for idx, qty_break in enumerate(DOMESTIC_QUANTITY_BREAKS):
+        blank_price = blank_prices[idx]
+        front_deco_price = front_prices[idx]
+        left_deco_price = left_prices[idx]
+        right_deco_price = right_prices[idx]
+        back_deco_price = back_prices[idx]
 
         # Per-piece total
         per_piece = blank_price + front_deco_price + left_deco_price + right_deco_price + back_deco_price + rush_fee + rope_price
 
         # One-time charges
-        digitizing_fee = DOMESTIC_ADDITIONAL_CHARGES["Embroidery Digitizing Fee"].get(qty_break, 0) * num_dst_files
+        digitizing_fee = _DOMESTIC_DIGITIZING_CENTS[idx] * num_dst_files
 
         # Total at this exact tier amount
-        total = (per_piece * qty_break) + digitizing_fee
-
-        results.append({
-            "quantity_break": qty_break,
-            "blank_price": round(blank_price, 2),
-            "front_decoration_price": round(front_deco_price, 2),
-            "left_decoration_price": round(left_deco_price, 2),
-            "right_decoration_price": round(right_deco_price, 2),
-            "back_decoration_price": round(back_deco_price, 2),
-            "rush_fee": round(rush_fee, 2),
-            "rope_price": round(rope_price, 2),
-            "per_piece_price": round(per_piece, 2),
-            "digitizing_fee": round(digitizing_fee, 2),
-            "subtotal": round(per_piece * qty_break, 2),
-            "total": round(total, 2),
-        })
+        subtotal = per_piece * qty_break
+        total = subtotal + digitizing_fee
+
+        # Values in _DOMESTIC_ROW_KEYS order, in dollars
+        results.append((
+            qty_break,
+            blank_price / 100,
+            front_deco_price / 100,
+            left_deco_price / 100,
+            right_deco_price / 100,
+            back_deco_price / 100,
+            rush_fee_dollars,
+            rope_price_dollars,
+            per_piece / 100,
+            digitizing_fee / 100,
+            subtotal / 100,
+            total / 100,
+        ))
 
     return {
         "quote_type": "domestic",
@@ -146,134 +300,100 @@ def calculate_overseas_quote(
     """
     Calculate an overseas quote.
 
-    Returns a dict with price breakdowns at each quantity break.
-    When an option doesn't meet MOQ at a quantity break, that break's
-    per_piece_price will be None (indicating "Does not meet MOQ").
+    Returns a dict with price breakdowns at each quantity break. Each break
+    carries `meets_moq`; when an option doesn't meet MOQ at a quantity
+    break, that break is just {"quantity_break": ..., "meets_moq": False}
+    with no price fields.
     """
-    if hat_type not in OVERSEAS_HAT_TYPES:
-        raise ValueError(f"Unknown hat type: {hat_type}")
+    return _copy_quote(_overseas_quote_cached(
+        hat_type, quantity, front_decoration, left_decoration, right_decoration,
+        back_decoration, visor_decoration, tuple(design_addons or ()),
+        tuple(accessories or ()), shipping_method,
+    ), _OVERSEAS_ROW_KEYS)
 
-    design_addons = design_addons or []
-    accessories = accessories or []
+
+@lru_cache(maxsize=4096)
+def _overseas_quote_cached(
+    hat_type: str,
+    quantity: int,
+    front_decoration: Optional[str],
+    left_decoration: Optional[str],
+    right_decoration: Optional[str],
+    back_decoration: Optional[str],
+    visor_decoration: Optional[str],
+    design_addons: tuple[str, ...],
+    accessories: tuple[str, ...],
+    shipping_method: str,
+) -> dict:
+    if hat_type not in _OVERSEAS_HAT_SET:
+        raise ValueError(f"Unknown hat type: {hat_type}")
 
     results = []
 
-    # Always return all quantity breaks for overseas quotes
-    for qty_break in OVERSEAS_QUANTITY_BREAKS:
-        # Track if any selected option doesn't meet MOQ at this quantity
-        meets_moq = True
-
-        # Base hat price
-        hat_prices = OVERSEAS_HAT_TYPES[hat_type]["prices"]
-        blank_price = hat_prices.get(qty_break, 0)
-
-        # Front decoration
-        front_deco_price = 0
-        if front_decoration and front_decoration in OVERSEAS_FRONT_DECORATION_PRICES:
-            price_dict = OVERSEAS_FRONT_DECORATION_PRICES[front_decoration]
-            if qty_break in price_dict:
-                front_deco_price = price_dict[qty_break]
-            else:
-                meets_moq = False
-
-        # Side decorations
-        left_deco_price = 0
-        if left_decoration and left_decoration in OVERSEAS_SIDE_DECORATION_PRICES:
-            price_dict = OVERSEAS_SIDE_DECORATION_PRICES[left_decoration]
-            if qty_break in price_dict:
-                left_deco_price = price_dict[qty_break]
-            else:
-                meets_moq = False
-
-        right_deco_price = 0
-        if right_decoration and right_decoration in OVERSEAS_SIDE_DECORATION_PRICES:
-            price_dict = OVERSEAS_SIDE_DECORATION_PRICES[right_decoration]
-            if qty_break in price_dict:
-                right_deco_price = price_dict[qty_break]
-            else:
-                meets_moq = False
-
-        # Back decoration
-        back_deco_price = 0
-        if back_decoration and back_decoration in OVERSEAS_BACK_DECORATION_PRICES:
-            price_dict = OVERSEAS_BACK_DECORATION_PRICES[back_decoration]
-            if qty_break in price_dict:
-                back_deco_price = price_dict[qty_break]
-            else:
-                meets_moq = False
-
-        # Visor decoration
-        visor_deco_price = 0
-        if visor_decoration and visor_decoration in OVERSEAS_VISOR_DECORATION_PRICES:
-            price_dict = OVERSEAS_VISOR_DECORATION_PRICES[visor_decoration]
-            if qty_break in price_dict:
-                visor_deco_price = price_dict[qty_break]
-            else:
-                meets_moq = False
-
-        # Design add-ons
-        addons_price = 0
-        for addon in design_addons:
-            if addon in OVERSEAS_DESIGN_ADDONS:
-                price_dict = OVERSEAS_DESIGN_ADDONS[addon]
-                if qty_break in price_dict:
-                    addons_price += price_dict[qty_break]
-                else:
-                    meets_moq = False
-
-        # Accessories
-        accessories_price = 0
-        for accessory in accessories:
-            if accessory in OVERSEAS_ACCESSORIES:
-                price_dict = OVERSEAS_ACCESSORIES[accessory]
-                if qty_break in price_dict:
-                    accessories_price += price_dict[qty_break]
-                else:
-                    meets_moq = False
-
-        # Shipping
-        shipping_price = 0
-        if shipping_method in OVERSEAS_SHIPPING:
-            shipping_price = OVERSEAS_SHIPPING[shipping_method].get(qty_break, 0)
+    selections = {
+        "front": front_decoration,
+        "left": left_decoration,
+        "right": right_decoration,
+        "back": back_decoration,
+        "visor": visor_decoration,
+    }
+
+    # Per-slot price vectors, and the breaks at which every selected option meets MOQ
+    moq_mask = _OVERSEAS_ALL_BREAKS
+    decoration_prices = []
+    for slot, _, vectors, masks in _OVERSEAS_DECORATION_SLOTS:
+        name = selections[slot]
+        decoration_prices.append(vectors.get(name, _OVERSEAS_ZEROS))
+        moq_mask &= masks.get(name, _OVERSEAS_ALL_BREAKS)
+    for addon in design_addons:
+        moq_mask &= _OVERSEAS_ADDON_MASK.get(addon, _OVERSEAS_ALL_BREAKS)
+    for accessory in accessories:
+        moq_mask &= _OVERSEAS_ACCESSORY_MASK.get(accessory, _OVERSEAS_ALL_BREAKS)
+
+    hat_prices = _OVERSEAS_HAT_VEC[hat_type]
+    addon_totals = _break_sums(
+        [_OVERSEAS_ADDON_VEC[a] for a in design_addons if a in _OVERSEAS_ADDON_VEC],
+        moq_mask, _OVERSEAS_ZEROS,
+    )
+    accessory_totals = _break_sums(
+        [_OVERSEAS_ACCESSORY_VEC[a] for a in accessories if a in _OVERSEAS_ACCESSORY_VEC],
+        moq_mask, _OVERSEAS_ZEROS,
+    )
+    shipping_prices = _OVERSEAS_SHIPPING_VEC.get(shipping_method, _OVERSEAS_ZEROS)
 
+    # Always return all quantity breaks for overseas quotes
+    for idx, qty_break in enumerate(OVERSEAS_QUANTITY_BREAKS):
         # If any option doesn't meet MOQ, mark this quantity break as invalid
-        if meets_moq:
-            hat_subtotal = blank_price + front_deco_price + left_deco_price + right_deco_price + back_deco_price + visor_deco_price + addons_price + accessories_price
-            per_piece_with_shipping = hat_subtotal + shipping_price
-            total = per_piece_with_shipping * quantity
-
-            results.append({
-                "quantity_break": qty_break,
-                "blank_price": round(blank_price, 2),
-                "front_decoration_price": round(front_deco_price, 2),
-                "left_decoration_price": round(left_deco_price, 2),
-                "right_decoration_price": round(right_deco_price, 2),
-                "back_decoration_price": round(back_deco_price, 2),
-                "visor_decoration_price": round(visor_deco_price, 2),
-                "addons_price": round(addons_price, 2),
-                "accessories_price": round(accessories_price, 2),
-                "hat_subtotal": round(hat_subtotal, 2),
-                "shipping_price": round(shipping_price, 2),
-                "per_piece_price": round(per_piece_with_shipping, 2),
-                "total": round(total, 2),
-            })
-        else:
-            # Option doesn't meet MOQ at this quantity break
-            results.append({
-                "quantity_break": qty_break,
-                "blank_price": None,
-                "front_decoration_price": None,
-                "left_decoration_price": None,
-                "right_decoration_price": None,
-                "back_decoration_price": None,
-                "visor_decoration_price": None,
-                "addons_price": None,
-                "accessories_price": None,
-                "hat_subtotal": None,
-                "shipping_price": None,
-                "per_piece_price": None,
-                "total": None,
-            })
+        # and send just the break, with no price fields
+        if not moq_mask >> idx & 1:
+            results.append((qty_break, False))
+            continue
+
+        # Values in _OVERSEAS_ROW_KEYS order
+        blank_price = hat_prices[idx]
+        row = [qty_break, True, round(blank_price, 2)]
+        hat_subtotal = blank_price
+        for prices in decoration_prices:
+            hat_subtotal += prices[idx]
+            row.append(round(prices[idx], 2))
+
+        addons_price = addon_totals[idx]
+        accessories_price = accessory_totals[idx]
+        hat_subtotal += addons_price
+        hat_subtotal += accessories_price
+        shipping_price = shipping_prices[idx]
+        per_piece_with_shipping = hat_subtotal + shipping_price
+        total = per_piece_with_shipping * quantity
+
+        row += (
+            round(addons_price, 2),
+            round(accessories_price, 2),
+            round(hat_subtotal, 2),
+            round(shipping_price, 2),
+            round(per_piece_with_shipping, 2),
+            round(total, 2),
+        )
+        results.append(tuple(row))
 
     return {
         "quote_type": "overseas",
@@ -284,8 +404,8 @@ def calculate_overseas_quote(
         "right_decoration": right_decoration,
         "back_decoration": back_decoration,
         "visor_decoration": visor_decoration,
-        "design_addons": design_addons,
-        "accessories": accessories,
+        "design_addons": list(design_addons),
+        "accessories": list(accessories),
         "shipping_method": shipping_method,
         "price_breaks": results,
     }
@@ -1,25 +1,108 @@
 """File storage service for handling uploads — uses Cloudflare R2 when configured, local disk as fallback."""
 
+import io
 import os
+import re
+import asyncio
 import uuid
 import base64
 import mimetypes
 from pathlib import Path
-from typing import Optional, Tuple, Union
+from typing import Iterable, Iterator, Optional, Tuple, Union
 
 from fastapi import UploadFile
+from PIL import Image
 
 from ..config import get_settings
 from . import r2_service
 
 settings = get_settings()
 
+# Settings read on every request, bound once at import.
+_UPLOAD_DIR = Path(settings.upload_dir)
+_LOCAL_URL_PREFIX = f"{settings.backend_url}/api/uploads/"
+_DEFAULT_MAX_SIZE_MB = settings.max_file_size_mb
+
+try:
+    # SIMD base64 — several times faster on multi-MB images and returns str
+    # directly, skipping the bytes -> str decode copy.
+    import pybase64
+
+    def encode_base64(data) -> str:
+        """Base64-encode bytes or any buffer to an ASCII str."""
+        return pybase64.b64encode_as_string(data)
+except ImportError:  # optional speedup; stdlib fallback
+    def encode_base64(data) -> str:
+        """Base64-encode bytes or any buffer to an ASCII str."""
+        return base64.b64encode(data).decode("ascii")
+
+
+# Raster formats the image models accept, keyed by PIL format name. Uploads
+# are sniffed once at ingest and stored under the canonical extension, so
+# generation can trust a stored file's suffix for its MIME type.
+_RASTER_FORMATS = {
+    "PNG": ("image/png", ".png"),
+    "JPEG": ("image/jpeg", ".jpg"),
+    # Multi-picture JPEGs (depth maps, gain maps) from phones and cameras;
+    # the primary frame is an ordinary JPEG.
+    "MPO": ("image/jpeg", ".jpg"),
+    "WEBP": ("image/webp", ".webp"),
+}
+_RASTER_MIME_TYPES = {"image/png", "image/jpeg", "image/jpg", "image/webp"}
+
+# MIME type for a stored raster by its (canonical) extension.
+IMAGE_MIME_BY_SUFFIX = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".webp": "image/webp",
+}
+
+
+def image_mime_type(path: str) -> str:
+    """MIME type for a stored image by extension; PNG when unknown."""
+    return IMAGE_MIME_BY_SUFFIX.get(Path(path).suffix.lower(), "image/png")
+
+
+def _sniff_raster(content: bytes) -> Optional[Tuple[str, str]]:
+    """
+    Return (mime_type, extension) if content is a PNG/JPEG/WEBP image.
+
+    Returns None for a valid image in some other format; raises if PIL
+    cannot open or verify the content at all.
+    """
+    with Image.open(io.BytesIO(content)) as img:
+        fmt = img.format
+        img.verify()
+    return _RASTER_FORMATS.get(fmt)
+
 
 def generate_unique_filename(original_filename: str) -> str:
     """Generate a unique filename while preserving extension."""
     ext = Path(original_filename).suffix.lower()
-    unique_id = str(uuid.uuid4())
-    return f"{unique_id}{ext}"
+    return f"{uuid.uuid4().hex}{ext}"
+
+
+# Uploads are pulled off the request in chunks of this size so an oversized
+# file is rejected as soon as it crosses the limit, not after it's all read.
+_UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+async def _read_upload(file: UploadFile, max_size_mb: int) -> bytes:
+    """Read an upload's body, raising ValueError once it exceeds max_size_mb."""
+    max_size = max_size_mb * 1024 * 1024
+    too_large = ValueError(f"File size exceeds maximum allowed ({max_size_mb}MB)")
+    if file.size is not None and file.size > max_size:
+        raise too_large
+
+    chunks = []
+    total = 0
+    while chunk := await file.read(_UPLOAD_CHUNK_SIZE):
+        total += len(chunk)
+        if total > max_size:
+            raise too_large
+        chunks.append(chunk)
+    return chunks[0] if len(chunks) == 1 else b"".join(chunks)
 
 
 def _normalize_key(path: str) -> str:
@@ -55,13 +138,9 @@ async def save_upload_file(
     if allowed_types and file.content_type not in allowed_types:
         raise ValueError(f"File type {file.content_type} not allowed. Allowed types: {allowed_types}")
 
-    content = await file.read()
+    content = await _read_upload(file, max_size_mb or _DEFAULT_MAX_SIZE_MB)
     file_size = len(content)
 
-    max_size = (max_size_mb or settings.max_file_size_mb) * 1024 * 1024
-    if file_size > max_size:
-        raise ValueError(f"File size exceeds maximum allowed ({max_size_mb or settings.max_file_size_mb}MB)")
-
     original_filename = file.filename or "upload"
     content_type = file.content_type or "application/octet-stream"
 
@@ -74,13 +153,24 @@ async def save_upload_file(
             except Exception as e:
                 raise ValueError(f"Could not convert vector logo to PNG: {e}") from e
 
+    if content_type.startswith("image/") or content_type == "application/octet-stream":
+        try:
+            sniffed = await asyncio.to_thread(_sniff_raster, content)
+        except Exception as e:
+            if content_type in _RASTER_MIME_TYPES:
+                raise ValueError("File is not a valid PNG, JPEG, or WEBP image") from e
+            sniffed = None
+        if sniffed:
+            content_type, ext = sniffed
+            original_filename = Path(original_filename).stem + ext
+
     filename = generate_unique_filename(original_filename)
     relative_path = f"{subdir}/{filename}"
 
     if r2_service._use_r2():
         await r2_service.upload_bytes(relative_path, content, content_type)
     else:
-        _save_local(relative_path, content)
+        await asyncio.to_thread(_save_local, relative_path, content)
 
     return relative_path, content_type, file_size
 
@@ -102,7 +192,7 @@ async def save_file_bytes(
     if r2_service._use_r2():
         await r2_service.upload_bytes(relative_path, data, content_type)
     else:
-        _save_local(relative_path, data)
+        await asyncio.to_thread(_save_local, relative_path, data)
 
     return relative_path
 
@@ -116,13 +206,16 @@ async def save_generated_image(
     filename = f"{design_id}_v{version_number}.png"
     relative_path = f"generated_designs/{filename}"
 
-    if isinstance(image_data, str):
-        image_data = base64.b64decode(image_data)
-
     if r2_service._use_r2():
+        if isinstance(image_data, str):
+            image_data = await asyncio.to_thread(base64.b64decode, image_data)
         await r2_service.upload_bytes(relative_path, image_data, "image/png")
     else:
-        _save_local(relative_path, image_data)
+        # Decode base64 straight into the file a slice at a time, rather
+        # than holding the text and the full decoded image at once.
+        if isinstance(image_data, str):
+            image_data = _b64decode_chunks(image_data)
+        await asyncio.to_thread(_save_local, relative_path, image_data)
 
     return relative_path
 
@@ -134,10 +227,7 @@ async def read_file_bytes(relative_path: str) -> Optional[bytes]:
     if r2_service._use_r2():
         return await r2_service.download_bytes(key)
     else:
-        full_path = Path(settings.upload_dir) / key
-        if full_path.exists():
-            return full_path.read_bytes()
-        return None
+        return await asyncio.to_thread(_read_local_bytes, key)
 
 
 def delete_file(relative_path: str) -> bool:
@@ -148,10 +238,8 @@ def delete_file(relative_path: str) -> bool:
         return r2_service.delete_object(key)
     else:
         try:
-            full_path = Path(settings.upload_dir) / key
-            if full_path.exists():
-                full_path.unlink()
-                return True
+            (_UPLOAD_DIR / key).unlink()
+            return True
         except Exception:
             pass
         return False
@@ -164,14 +252,77 @@ def get_file_url(relative_path: str) -> str:
     if r2_service._use_r2():
         return r2_service.get_public_url(key)
     else:
-        return f"{settings.backend_url}/api/uploads/{key}"
+        return _LOCAL_URL_PREFIX + key
 
 
 # --- Local filesystem fallback ---
 
 
-def _save_local(relative_path: str, data: bytes):
-    """Save bytes to local filesystem."""
-    full_path = Path(settings.upload_dir) / relative_path
-    full_path.parent.mkdir(parents=True, exist_ok=True)
-    full_path.write_bytes(data)
+def _read_local_bytes(key: str) -> Optional[bytes]:
+    """Read a local file's bytes. Returns None if not found."""
+    try:
+        return (_UPLOAD_DIR / key).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+# Upload subdirectories already created this process, so saves skip the
+# mkdir syscall after the first one per directory.
+_ENSURED_DIRS: set = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    """mkdir -p, once per directory per process."""
+    if path not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
+# Raw-text slice size for streaming decodes (~192KB decoded per slice).
+_B64_CHUNK_CHARS = 1 << 18
+# Characters b64decode discards in its default, non-validating mode
+# (line breaks in wrapped base64, mostly).
+_B64_DISCARD_RE = re.compile(r"[^A-Za-z0-9+/=]")
+
+
+def _b64decode_chunks(data: str) -> Iterator[bytes]:
+    """
+    Decode base64 text lazily, one _B64_CHUNK_CHARS slice at a time.
+
+    Matches base64.b64decode: characters outside the alphabet are skipped,
+    and a partial 4-character group at the end of a slice is carried into
+    the next so wrapped input never splits a group.
+    """
+    carry = ""
+    for start in range(0, len(data), _B64_CHUNK_CHARS):
+        text = carry + _B64_DISCARD_RE.sub("", data[start:start + _B64_CHUNK_CHARS])
+        cut = len(text) - len(text) % 4
+        carry = text[cut:]
+        if cut:
+            yield base64.b64decode(text[:cut])
+    if carry:
+        yield base64.b64decode(carry)
+
+
+def _save_local(relative_path: str, data: Union[bytes, Iterable[bytes]]):
+    """
+    Save bytes to the local filesystem.
+
+    Writes to a temp file beside the target and renames it into place, so
+    a reader (or the static file mount) never sees a half-written file.
+    `data` may be bytes or an iterable of byte chunks.
+    """
+    full_path = _UPLOAD_DIR / relative_path
+    _ensure_dir(full_path.parent)
+    tmp_path = full_path.with_name(f".{full_path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            if isinstance(data, (bytes, bytearray)):
+                f.write(data)
+            else:
+                for chunk in data:
+                    f.write(chunk)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
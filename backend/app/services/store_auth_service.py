@@ -91,7 +91,7 @@ def authenticate_store_user(
 
 def create_store_user_token(user: StoreUser) -> str:
     """Create a JWT token for a store user (includes role in payload)."""
-    from jose import jwt as jose_jwt
+    import jwt
 
     expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
     to_encode = {
@@ -101,7 +101,7 @@ def create_store_user_token(user: StoreUser) -> str:
         "user_type": "store",  # Distinguish from HQ users
         "exp": expire,
     }
-    return jose_jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
 def generate_password_reset_token() -> str:
@@ -111,7 +111,7 @@ def generate_password_reset_token() -> str:
 
 def generate_email_verification_token(user_id: str, email: str) -> str:
     """Generate a JWT token for email verification (24hr expiry)."""
-    from jose import jwt as jose_jwt
+    import jwt
     expire = datetime.utcnow() + timedelta(hours=24)
     to_encode = {
         "sub": user_id,
@@ -119,24 +119,25 @@ def generate_email_verification_token(user_id: str, email: str) -> str:
         "purpose": "email_verification",
         "exp": expire,
     }
-    return jose_jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
 def verify_email_verification_token(token: str) -> dict:
     """Verify an email verification token. Returns {user_id, email} or raises."""
-    from jose import jwt as jose_jwt, JWTError
+    import jwt
+    from jwt import InvalidTokenError
     try:
-        payload = jose_jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         if payload.get("purpose") != "email_verification":
             raise ValueError("Invalid token purpose")
         return {"user_id": payload["sub"], "email": payload["email"]}
-    except JWTError:
+    except InvalidTokenError:
         raise ValueError("Invalid or expired verification token")
 
 
 def generate_password_reset_token_jwt(user_id: str, email: str) -> str:
     """Generate a JWT token for password reset (1hr expiry)."""
-    from jose import jwt as jose_jwt
+    import jwt
     expire = datetime.utcnow() + timedelta(hours=1)
     to_encode = {
         "sub": user_id,
@@ -144,18 +145,19 @@ def generate_password_reset_token_jwt(user_id: str, email: str) -> str:
         "purpose": "password_reset",
         "exp": expire,
     }
-    return jose_jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
 
 
 def verify_password_reset_token_jwt(token: str) -> dict:
     """Verify a password reset token. Returns {user_id, email} or raises."""
-    from jose import jwt as jose_jwt, JWTError
+    import jwt
+    from jwt import InvalidTokenError
     try:
-        payload = jose_jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
+        payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
         if payload.get("purpose") != "password_reset":
             raise ValueError("Invalid token purpose")
         return {"user_id": payload["sub"], "email": payload["email"]}
-    except JWTError:
+    except InvalidTokenError:
         raise ValueError("Invalid or expired reset token")
 
 
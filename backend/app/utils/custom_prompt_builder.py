@@ -1,11 +1,19 @@
 """Utility for building custom design generation prompts."""
 
+from types import MappingProxyType
 from typing import List, Optional, Dict
 
-from .prompt_builder import LEGAL_TEXT, format_hat_style, format_material, format_construction
+from .prompt_builder import (
+    CLOSURES,
+    HAT_STYLES,
+    LEGAL_TEXT,
+    STRUCTURES,
+    _REVISION_HEADER,
+    format_construction,
+)
 
 # Decoration method display names
-DECORATION_METHODS = {
+DECORATION_METHODS = MappingProxyType({
     "embroidery": "flat embroidery",
     "screen_print": "screen printing",
     "patch": "sewn patch",
@@ -15,17 +23,17 @@ DECORATION_METHODS = {
     "sublimation": "sublimation printing",
     "hd_print": "high-density print (raised, glossy 3D-look ink that stands proud of the fabric — similar to 3D printing)",
     "sublimated_embroidery": "sublimated embroidery (an embroidered patch where the thread surface is dye-sublimated for full-color photographic detail)",
-}
+})
 
 # Size display names
-SIZES = {
+SIZES = MappingProxyType({
     "small": "small (approximately 2 inches)",
     "medium": "medium (approximately 3 inches)",
     "large": "large (approximately 4 inches)",
-}
+})
 
 # Location display names
-LOCATION_NAMES = {
+LOCATION_NAMES = MappingProxyType({
     "front": "front center",
     "front_lower_left": "front lower-left (below and to the left of the main front logo)",
     "front_lower_right": "front lower-right (below and to the right of the main front logo)",
@@ -33,20 +41,10 @@ LOCATION_NAMES = {
     "right": "right side",
     "back": "back",
     "visor": "underneath the visor",
-}
+})
 
-# Structure display names
-STRUCTURES = {
-    "structured": "structured (with front panel buckram stiffener)",
-    "unstructured": "unstructured (soft, relaxed crown)",
-}
-
-# Closure display names
-CLOSURES = {
-    "snapback": "plastic snapback closure",
-    "metal_slider_buckle": "metal slider buckle closure",
-    "velcro_strap": "velcro strap closure",
-}
+# Upper-cased location names for the decoration headings, computed once.
+LOCATION_NAMES_UPPER = MappingProxyType({k: v.upper() for k, v in LOCATION_NAMES.items()})
 
 
 def format_decoration_method(method: str) -> str:
@@ -93,96 +91,17 @@ def format_closure(closure: Optional[str]) -> str:
     return CLOSURES.get(closure, closure)
 
 
-def build_custom_design_prompt(
-    hat_style: str,
-    material: str,
-    brand_name: str,
-    location_logos: List[Dict],
-    crown_color: Optional[str] = None,
-    visor_color: Optional[str] = None,
-    structure: Optional[str] = None,
-    closure: Optional[str] = None,
-    reference_hat_path: Optional[str] = None,
-) -> str:
-    """
-    Build the full prompt for custom design generation with per-location logos.
-
-    Args:
-        hat_style: The hat style code (e.g., '6-panel-hat')
-        material: The material code (e.g., 'cotton-twill')
-        brand_name: The brand/client name
-        location_logos: List of location logo specifications with keys:
-            - location: The location code (front, left, right, back, visor)
-            - decoration_method: The decoration method code
-            - size: The size code
-            - size_details: Optional custom size details
-        crown_color: Color of the hat crown
-        visor_color: Color of the visor
-        structure: Hat structure (structured or unstructured)
-        closure: Closure type (snapback, metal_slider_buckle, velcro_strap)
-        reference_hat_path: Optional path to reference hat image
-
-    Returns:
-        The complete prompt string for image generation
-    """
-    formatted_style = format_hat_style(hat_style)
-    formatted_material = format_material(material)
-    construction_sentence = format_construction(hat_style, material)
-    formatted_crown_color = format_color(crown_color)
-    formatted_visor_color = format_color(visor_color)
-    formatted_structure = format_structure(structure)
-    formatted_closure = format_closure(closure)
-
-    # Build decoration location descriptions
-    decoration_descriptions = []
-    for logo in location_logos:
-        location_name = format_location(logo["location"])
-        method_name = format_decoration_method(logo["decoration_method"])
-        size_name = format_size(logo["size"], logo.get("size_details"))
-
-        decoration_descriptions.append(
-            f"- **{location_name.upper()}**: {method_name} using the provided {logo['location']} logo, sized {size_name}"
-        )
-
-    decorations_text = "\n".join(decoration_descriptions)
-
-    if reference_hat_path:
-        # Reference hat recreation mode
-        prompt = f"""RENDERING STYLE — READ FIRST:
+# Opening block shared by both prompt modes (no placeholders).
+_RENDERING_STYLE_HEADER = """RENDERING STYLE — READ FIRST:
 The output is a PHOTOREALISTIC studio product photograph composed in a 3x2 grid.
 - All six cells must look like real photographs of a real physical hat (and a real human in cell 6).
 - DO NOT produce cartoon, illustration, line-art, vector-flat, watercolor, painted, sketched, or otherwise stylized output.
 - The layout template image provided alongside this prompt is itself a cartoon line-art illustration — that is for STRUCTURE ONLY. Its art style must NOT appear in your output.
-- Lighting: soft professional studio lighting. Background: clean neutral white. Materials: realistic fabric weave, stitching, and shadow detail.
-
-Recreate this reference hat design with the customer's branding.
-
-REFERENCE HAT: An image of a reference hat has been provided. Match the following aspects:
-- Overall hat shape and style
-- Panel structure and construction details
-- Any distinctive design elements (stitching patterns, contrast elements, etc.)
-
-TARGET HAT SPECIFICATIONS:
-- Hat type: **{formatted_style}**
-- Construction & materials: {construction_sentence}
-- Structure: **{formatted_structure}**
-- Closure: **{formatted_closure}**
-- Crown color: **{formatted_crown_color}**
-- Visor/brim color: **{formatted_visor_color}**
-- Brand: **{brand_name}**
-
-LOGO PLACEMENTS - Replace any existing logos/branding with the customer's provided logos at these specific locations:
-{decorations_text}
-
-CRITICAL INSTRUCTIONS:
-1. Use ONLY the provided logo images for each location - do NOT search for or use any other logos
-2. Match the reference hat's style and aesthetic as closely as possible
-3. Use the specified crown color ({formatted_crown_color}) and visor color ({formatted_visor_color})
-4. The hat must be **{formatted_structure}** with a **{formatted_closure}**
-5. Maintain professional quality and clean execution
-6. Each logo should be clearly visible and properly sized for its location
+- Lighting: soft professional studio lighting. Background: clean neutral white. Materials: realistic fabric weave, stitching, and shadow detail."""
 
-ALLOWED DECORATION METHODS PER LOCATION:
+# Everything after the mode-specific instructions: allowed methods, callouts,
+# layout and legal text. Identical for both modes, so it's built once here.
+_COMMON_TAIL = """ALLOWED DECORATION METHODS PER LOCATION:
 - FRONT: flat embroidery, 3D embroidery, PVC patch, woven patch, faux leather patch, embroidered patch, sublimated patch, or 3D printing.
 - LEFT SIDE: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
 - RIGHT SIDE: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
@@ -223,87 +142,142 @@ STRICT RULES:
 
 Professional studio lighting, white background, 4k resolution.
 
-Add the following legal language to the bottom of the image: {LEGAL_TEXT}"""
-    else:
-        # Standard custom design mode
-        prompt = f"""RENDERING STYLE — READ FIRST:
-The output is a PHOTOREALISTIC studio product photograph composed in a 3x2 grid.
-- All six cells must look like real photographs of a real physical hat (and a real human in cell 6).
-- DO NOT produce cartoon, illustration, line-art, vector-flat, watercolor, painted, sketched, or otherwise stylized output.
-- The layout template image provided alongside this prompt is itself a cartoon line-art illustration — that is for STRUCTURE ONLY. Its art style must NOT appear in your output.
-- Lighting: soft professional studio lighting. Background: clean neutral white. Materials: realistic fabric weave, stitching, and shadow detail.
+Add the following legal language to the bottom of the image: """ + LEGAL_TEXT
+
+# Mode-specific middles, filled with str.format_map. Placeholders: style,
+# construction, structure, closure, crown_color, visor_color, brand_name,
+# decorations.
+
+# Reference hat recreation mode
+_REFERENCE_PROMPT_TEMPLATE = """
+
+Recreate this reference hat design with the customer's branding.
+
+REFERENCE HAT: An image of a reference hat has been provided. Match the following aspects:
+- Overall hat shape and style
+- Panel structure and construction details
+- Any distinctive design elements (stitching patterns, contrast elements, etc.)
+
+TARGET HAT SPECIFICATIONS:
+- Hat type: **{style}**
+- Construction & materials: {construction}
+- Structure: **{structure}**
+- Closure: **{closure}**
+- Crown color: **{crown_color}**
+- Visor/brim color: **{visor_color}**
+- Brand: **{brand_name}**
 
-Create a photorealistic product shot of a **{formatted_style}**.
+LOGO PLACEMENTS - Replace any existing logos/branding with the customer's provided logos at these specific locations:
+{decorations}
+
+CRITICAL INSTRUCTIONS:
+1. Use ONLY the provided logo images for each location - do NOT search for or use any other logos
+2. Match the reference hat's style and aesthetic as closely as possible
+3. Use the specified crown color ({crown_color}) and visor color ({visor_color})
+4. The hat must be **{structure}** with a **{closure}**
+5. Maintain professional quality and clean execution
+6. Each logo should be clearly visible and properly sized for its location
+
+"""
+
+# Standard custom design mode
+_STANDARD_PROMPT_TEMPLATE = """
+
+Create a photorealistic product shot of a **{style}**.
 
 HAT CONSTRUCTION:
-- Materials: {construction_sentence}
-- Structure: **{formatted_structure}**
-- Closure: **{formatted_closure}**
+- Materials: {construction}
+- Structure: **{structure}**
+- Closure: **{closure}**
 
 HAT COLORS:
-- Crown/panels: **{formatted_crown_color}**
-- Visor/brim: **{formatted_visor_color}**
+- Crown/panels: **{crown_color}**
+- Visor/brim: **{visor_color}**
 
 BRAND: **{brand_name}**
 
 DECORATION SPECIFICATIONS - Place the provided logos at exactly these locations using the specified methods:
-{decorations_text}
+{decorations}
 
 CRITICAL INSTRUCTIONS:
 1. Use ONLY the provided logo images for each location - do NOT search for or use any other logos from the internet
-2. The hat crown/panels must be **{formatted_crown_color}** color
-3. The visor/brim must be **{formatted_visor_color}** color
-4. The hat must be **{formatted_structure}** with a **{formatted_closure}**
+2. The hat crown/panels must be **{crown_color}** color
+3. The visor/brim must be **{visor_color}** color
+4. The hat must be **{structure}** with a **{closure}**
 5. Place each logo exactly at its specified location
 6. Use the specified decoration method for each location (embroidery has texture and depth, patches are raised, screen print is flat, etc.)
 7. Size each decoration according to the specification
 8. Do NOT add any decorations at locations not specified above
 9. Keep the design clean and professional
 
-ALLOWED DECORATION METHODS PER LOCATION:
-- FRONT: flat embroidery, 3D embroidery, PVC patch, woven patch, faux leather patch, embroidered patch, sublimated patch, or 3D printing.
-- LEFT SIDE: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
-- RIGHT SIDE: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
-- BACK: flat embroidery ONLY.
-- UNDERBILL (inside visor): sublimated print ONLY.
-Do NOT use decoration methods not listed for a given location.
-
-DECORATION METHOD CALLOUTS:
-Label each unique decoration ONCE across the entire image. Rules:
-- Each decoration method should be labeled EXACTLY ONCE in the view where it is most clearly visible. Do NOT label the same decoration in multiple views.
-- Format: thin line or arrow from label to the decoration it identifies.
-- Label text = exact method name, e.g. "Flat Embroidery", "3D Embroidery", "PVC Patch", "Woven Patch", "Sublimated Patch", "Sublimated Print".
-- Style: clean sans-serif font, black text on a small white pill/tag background.
-- Do NOT add ANY labels to the MODEL VIEW (view #6). The model view should be clean with no callouts.
-- Only label decorations in hat-only views (views 1-5). Pick the view where each decoration is most prominent.
-
-IMAGE LAYOUT — Match the provided LAYOUT TEMPLATE image precisely. The template defines a 3x2 grid with EXACTLY 6 UNIQUE VIEWS. Use the template ONLY for grid composition and angle labels — do not copy its hat shape, colors, or design.
-
-Each view shows the SAME hat from a DIFFERENT angle. Same design, same colors, same logos, same decorations in every view.
-
-Top row:
-1. **FRONT** (top-left) — hat facing camera straight-on, front panel visible
-2. **WEARERS RIGHT** (top-center) — hat rotated so the WEARER'S RIGHT side faces the camera; the brim points to the LEFT side of the image
-3. **WEARERS LEFT** (top-right) — hat rotated so the WEARER'S LEFT side faces the camera; the brim points to the RIGHT side of the image
-
-Bottom row:
-4. **BACK** (bottom-left) — hat rotated 180°, back panel and closure visible
-5. **UNDERVISOR** (bottom-center) — hat flipped to show the underside of the visor/brim and the sweatband
-6. **MODEL** (bottom-right) — PHOTOREALISTIC professional studio photograph of a real adult male model wearing the hat, head-and-shoulders portrait. This must look like an actual photo of a real person — NOT a cartoon, NOT an illustration, NOT a stylized drawing, NOT line-art. Skin, hair, fabric textures must all read as photographic. Ignore the cartoon person shown in the layout template — the template's art style is for layout reference only and must NOT be reproduced in this cell.
+"""
 
-Place the angle labels (FRONT, WEARERS RIGHT, WEARERS LEFT, BACK, UNDERVISOR, MODEL) under each box exactly as shown in the LAYOUT TEMPLATE.
 
-STRICT RULES:
-- Exactly 6 views. Not 4, not 5, not 7, not 8. Exactly 6.
-- Each view must show a DIFFERENT angle — no duplicate or near-duplicate views.
-- WEARERS RIGHT and WEARERS LEFT are mirror images — they must NOT look the same. WEARERS RIGHT shows the right side panel from the wearer's perspective; WEARERS LEFT shows the left side panel from the wearer's perspective.
-- The design must be IDENTICAL across all views — do not change decorations, colors, or logos between views.
+def build_custom_design_prompt(
+    hat_style: str,
+    material: str,
+    brand_name: str,
+    location_logos: List[Dict],
+    crown_color: Optional[str] = None,
+    visor_color: Optional[str] = None,
+    structure: Optional[str] = None,
+    closure: Optional[str] = None,
+    reference_hat_path: Optional[str] = None,
+) -> str:
+    """
+    Build the full prompt for custom design generation with per-location logos.
 
-Professional studio lighting, white background, 4k resolution.
+    Args:
+        hat_style: The hat style code (e.g., '6-panel-hat')
+        material: The material code (e.g., 'cotton-twill')
+        brand_name: The brand/client name
+        location_logos: List of location logo specifications with keys:
+            - location: The location code (front, left, right, back, visor)
+            - decoration_method: The decoration method code
+            - size: The size code
+            - size_details: Optional custom size details
+        crown_color: Color of the hat crown
+        visor_color: Color of the visor
+        structure: Hat structure (structured or unstructured)
+        closure: Closure type (snapback, metal_slider_buckle, velcro_strap)
+        reference_hat_path: Optional path to reference hat image
 
-Add the following legal language to the bottom of the image: {LEGAL_TEXT}"""
+    Returns:
+        The complete prompt string for image generation
+    """
+    formatted_style = HAT_STYLES.get(hat_style, hat_style)
+    construction_sentence = format_construction(hat_style, material)
+    formatted_crown_color = format_color(crown_color)
+    formatted_visor_color = format_color(visor_color)
+    formatted_structure = format_structure(structure)
+    formatted_closure = format_closure(closure)
 
-    return prompt
+    # Build decoration location descriptions (lookups bound once for the
+    # comprehension; str.join is handed a list, which it would build anyway)
+    location_heading = LOCATION_NAMES_UPPER.get
+    method_name = DECORATION_METHODS.get
+    decorations_text = "\n".join([
+        f"- **{location_heading(logo['location']) or logo['location'].upper()}**: "
+        f"{method_name(logo['decoration_method'], logo['decoration_method'])} "
+        f"using the provided {logo['location']} logo, "
+        f"sized {format_size(logo['size'], logo.get('size_details'))}"
+        for logo in location_logos
+    ])
+
+    template = _REFERENCE_PROMPT_TEMPLATE if reference_hat_path else _STANDARD_PROMPT_TEMPLATE
+    return _RENDERING_STYLE_HEADER + template.format_map({
+        "style": formatted_style,
+        "construction": construction_sentence,
+        "structure": formatted_structure,
+        "closure": formatted_closure,
+        "crown_color": formatted_crown_color,
+        "visor_color": formatted_visor_color,
+        "brand_name": brand_name,
+        "decorations": decorations_text,
+    }) + _COMMON_TAIL
+
+
+_CUSTOM_REVISION_TAIL = "\n\nPlease generate a revised version of the hat design incorporating the requested changes while maintaining the exact logo placements and decoration methods specified. Do not change the logos themselves - only modify the hat design, colors, or placement as requested."
 
 
 def build_custom_revision_prompt(
@@ -320,9 +294,4 @@ def build_custom_revision_prompt(
     Returns:
         The complete prompt for revision
     """
-    return f"""{original_prompt}
-
-REVISION REQUESTED:
-{revision_notes}
-
-Please generate a revised version of the hat design incorporating the requested changes while maintaining the exact logo placements and decoration methods specified. Do not change the logos themselves - only modify the hat design, colors, or placement as requested."""
+    return "".join((original_prompt, _REVISION_HEADER, revision_notes, _CUSTOM_REVISION_TAIL))
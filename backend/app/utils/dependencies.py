@@ -1,87 +1,216 @@
-from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import base64
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer
+import jwt
+import orjson
+from jwt import ExpiredSignatureError, ImmatureSignatureError, InvalidTokenError
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 
 from ..database import get_db
 from ..config import get_settings
 from ..models import User
 from ..schemas.auth import TokenData
 
-security = HTTPBearer(auto_error=False)
+class _BearerToken(HTTPBearer):
+    """
+    HTTPBearer that returns the raw token string, or None.
+
+    Parses the Authorization header directly instead of building an
+    HTTPAuthorizationCredentials per request. Subclassing keeps the bearer
+    scheme registered in the OpenAPI docs.
+    """
+
+    async def __call__(self, request: Request) -> Optional[str]:
+        authorization = request.headers.get("authorization")
+        if authorization and authorization[:7].lower() == "bearer ":
+            return authorization[7:] or None
+        return None
+
+
+security = _BearerToken(auto_error=False)
 settings = get_settings()
 
+# JWT settings, bound once at import
+_JWT_SECRET = settings.jwt_secret
+_JWT_ALGORITHM = settings.jwt_algorithm
+_JWT_ALGORITHMS = [_JWT_ALGORITHM]
+_JWT_EXPIRATION = timedelta(hours=settings.jwt_expiration_hours)
+_JWT_SECRET_BYTES = _JWT_SECRET.encode()
+
+# Recently rejected tokens -> monotonic time of rejection. A frontend holding
+# a stale token after logout or expiry keeps sending it; these are refused
+# with one dict lookup instead of another HMAC. Tokens are never logged.
+_NEGATIVE_CACHE_ENABLED = settings.jwt_negative_cache
+_BAD_TOKENS_MAX = 2048
+_BAD_TOKEN_TTL_SECONDS = 300.0
+_bad_tokens: "OrderedDict[str, float]" = OrderedDict()
+_bad_tokens_lock = threading.Lock()  # auth runs on the threadpool
+
 
 def create_access_token(user_id: str, email: str) -> str:
     """Create a JWT access token."""
-    from datetime import datetime, timedelta
-
-    expire = datetime.utcnow() + timedelta(hours=settings.jwt_expiration_hours)
+    expire = datetime.utcnow() + _JWT_EXPIRATION
     to_encode = {
         "sub": user_id,
         "email": email,
         "exp": expire,
     }
-    return jwt.encode(to_encode, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, _JWT_SECRET, algorithm=_JWT_ALGORITHM)
 
 
-def decode_token(token: str) -> Optional[TokenData]:
-    """Decode and validate a JWT token."""
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict:
+    """
+    Verify an HS256 token and return its claims, raising InvalidTokenError.
+
+    A direct path for the only algorithm we issue: one HMAC over the signing
+    input, compared against the token's signature before anything is parsed.
+    The algorithm is fixed here, never taken from the token header; a header
+    naming anything else is rejected.
+    """
+    signing_input, _, signature = token.rpartition(".")
+    header_segment, _, payload_segment = signing_input.partition(".")
     try:
+        expected = base64.urlsafe_b64encode(
+            hmac.new(_JWT_SECRET_BYTES, signing_input.encode("ascii"), hashlib.sha256).digest()
+        ).rstrip(b"=")
+        if not hmac.compare_digest(expected, signature.encode("ascii")):
+            raise InvalidTokenError("Signature verification failed")
+        header = orjson.loads(_b64url_decode(header_segment))
+        claims = orjson.loads(_b64url_decode(payload_segment))
+    except ValueError as e:  # bad base64, JSON or non-ASCII input
+        raise InvalidTokenError("Malformed token") from e
+
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        raise InvalidTokenError("Unexpected token algorithm")
+    if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str):
+        raise InvalidTokenError("Token is missing a subject")
+    exp = claims.get("exp")
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        raise InvalidTokenError("Token is missing an expiry")
+    now = time.time()
+    if exp <= now:
+        raise ExpiredSignatureError("Signature has expired")
+    nbf = claims.get("nbf")
+    if nbf is not None and (isinstance(nbf, bool) or not isinstance(nbf, (int, float)) or nbf > now):
+        raise ImmatureSignatureError("The token is not yet valid (nbf)")
+    return claims
+
+
+@lru_cache(maxsize=4096)
+def _decode_token_cached(token: str) -> Tuple[Optional[str], Optional[str], float]:
+    """
+    Verify a token's signature and claims, returning (user_id, email, exp).
+
+    A client sends the same token on every request until it expires, so
+    verified tokens are memoized and only the expiry is re-checked per
+    request. Invalid tokens raise InvalidTokenError, which lru_cache doesn't
+    cache.
+    """
+    if _JWT_ALGORITHM == "HS256":
+        payload = _decode_hs256(token)
+    else:
         payload = jwt.decode(
-            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+            token, _JWT_SECRET, algorithms=_JWT_ALGORITHMS, options={"require": ["exp", "sub"]}
         )
-        user_id: str = payload.get("sub")
-        email: str = payload.get("email")
-        if user_id is None:
-            return None
-        return TokenData(user_id=user_id, email=email)
-    except JWTError:
-        return None
+    return payload["sub"], payload.get("email"), payload["exp"]
 
 
-async def get_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
-) -> Optional[User]:
-    """Get current authenticated user from JWT token."""
-    if credentials is None:
+def _remember_bad_token(token: str) -> None:
+    """Add a rejected token to the negative cache, evicting the oldest."""
+    if not _NEGATIVE_CACHE_ENABLED:
+        return
+    with _bad_tokens_lock:
+        _bad_tokens[token] = time.monotonic()
+        _bad_tokens.move_to_end(token)
+        if len(_bad_tokens) > _BAD_TOKENS_MAX:
+            _bad_tokens.popitem(last=False)
+
+
+def decode_token(token: str) -> Optional[TokenData]:
+    """Decode and validate a JWT token."""
+    if _NEGATIVE_CACHE_ENABLED:
+        rejected_at = _bad_tokens.get(token)
+        if rejected_at is not None:
+            if time.monotonic() - rejected_at < _BAD_TOKEN_TTL_SECONDS:
+                return None
+            _bad_tokens.pop(token, None)
+
+    try:
+        user_id, email, exp = _decode_token_cached(token)
+    except ImmatureSignatureError:
+        # Not valid *yet*; don't remember it as bad
         return None
+    except InvalidTokenError:
+        _remember_bad_token(token)
+        return None
+    if user_id is None or exp <= time.time():
+        # An expired token stays in the LRU until evicted; from here on the
+        # negative cache answers for it
+        _remember_bad_token(token)
+        return None
+    return TokenData(user_id=user_id, email=email)
+
 
-    token_data = decode_token(credentials.credentials)
+def _authenticate(
+    request: Request,
+    token: Optional[str] = Depends(security),
+    db: Session = Depends(get_db),
+) -> Tuple[Optional[User], str]:
+    """
+    Resolve the bearer token to a User, or None and the reason it failed.
+
+    Both auth dependencies build on this, so FastAPI's per-request
+    dependency cache decodes the token and loads the user at most once.
+    The user is also pinned to request.state.user, so code holding only the
+    Request (middleware, exception handlers) can reach it without a reload.
+
+    A plain def: the User load is a blocking Session call, so FastAPI runs
+    this on the threadpool instead of the event loop.
+    """
+    if token is None:
+        return None, "Not authenticated"
+
+    token_data = decode_token(token)
     if token_data is None:
-        return None
+        return None, "Invalid token"
 
-    user = db.query(User).filter(User.id == token_data.user_id).first()
-    return user
+    # Primary-key load; hits the session identity map before emitting SQL
+    user = db.get(User, token_data.user_id)
+    if user is None:
+        return None, "User not found"
+    request.state.user = user
+    return user, ""
+
+
+async def get_current_user(
+    auth: Tuple[Optional[User], str] = Depends(_authenticate),
+) -> Optional[User]:
+    """Get current authenticated user from JWT token."""
+    return auth[0]
 
 
 async def require_auth(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
+    auth: Tuple[Optional[User], str] = Depends(_authenticate),
 ) -> User:
     """Require authentication - raises 401 if not authenticated."""
-    if credentials is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    token_data = decode_token(credentials.credentials)
-    if token_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-
-    user = db.query(User).filter(User.id == token_data.user_id).first()
+    user, failure = auth
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
+            detail=failure,
             headers={"WWW-Authenticate": "Bearer"},
         )
 
@@ -1,31 +1,33 @@
 """Utility for building design generation prompts."""
 
-from typing import Optional, List, Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Dict, Final, List, Mapping, Optional, Tuple
 
 # Legal text to include in generated images
-LEGAL_TEXT = """All designs, artwork, and concepts presented herein are the sole property of King Cap and are provided for the exclusive consideration of the intended recipient. These materials are confidential and may not be copied, reproduced, shared, or used in whole or in part for any purpose other than reviewing potential production with King Cap. Any unauthorized use, reproduction, or distribution of these designs is strictly prohibited and may result in legal action."""
+LEGAL_TEXT: Final[str] = """All designs, artwork, and concepts presented herein are the sole property of King Cap and are provided for the exclusive consideration of the intended recipient. These materials are confidential and may not be copied, reproduced, shared, or used in whole or in part for any purpose other than reviewing potential production with King Cap. Any unauthorized use, reproduction, or distribution of these designs is strictly prohibited and may result in legal action."""
 
 # Hat style display names
-HAT_STYLES = {
+HAT_STYLES = MappingProxyType({
     "6-panel-hat": "6-panel hat",
     "6-panel-trucker": "6-panel trucker hat",
     "5-panel-hat": "A-Frame 5-panel hat",
     "5-panel-trucker": "A-Frame 5-panel trucker hat",
     "perforated-6-panel": "perforated 6-panel hat",
     "perforated-5-panel": "perforated A-Frame 5-panel hat",
-}
+})
 
 # Material display names
-MATERIALS = {
+MATERIALS = MappingProxyType({
     "cotton-twill": "cotton twill",
     "performance-polyester": "performance polyester",
     "nylon": "nylon",
     "canvas": "canvas",
     "let-ai-choose": "a high-quality fabric that best fits the design direction",
-}
+})
 
 # Style direction display names
-STYLE_DIRECTIONS = {
+STYLE_DIRECTIONS = MappingProxyType({
     "simple": "Simple",
     "modern": "Modern",
     "luxurious": "Luxurious",
@@ -35,27 +37,27 @@ STYLE_DIRECTIONS = {
     "collegiate": "Collegiate",
     # Sentinel: when present, build_design_prompt uses ONLY the custom description.
     "describe-below": "",
-}
+})
 
 # Structure display names
-STRUCTURES = {
+STRUCTURES = MappingProxyType({
     "structured": "structured (with front panel buckram stiffener)",
     "unstructured": "unstructured (soft, relaxed crown)",
-}
+})
 
 # Closure display names
-CLOSURES = {
+CLOSURES = MappingProxyType({
     "snapback": "plastic snapback closure",
     "metal_slider_buckle": "metal slider buckle closure",
     "velcro_strap": "velcro strap closure",
-}
+})
 
 # Variation hints for generating 3 distinct versions
-VARIATION_HINTS = [
+VARIATION_HINTS: Final[Tuple[str, ...]] = (
     "Create a unique interpretation focusing on classic, clean aesthetics with traditional placement and timeless appeal.",
     "Create a unique interpretation focusing on bold, eye-catching elements with striking color contrast and prominent branding.",
     "Create a unique interpretation focusing on creative, unexpected details with modern flair and distinctive character.",
-]
+)
 
 
 def format_hat_style(style: str) -> str:
@@ -81,7 +83,7 @@ def format_construction(hat_style: str, material: str) -> str:
     define a trucker, so the model renders a solid-fabric cap instead.
     """
     let_ai_choose = (material or "").lower() == "let-ai-choose"
-    fmt_material = format_material(material)
+    fmt_material = MATERIALS.get(material, material)
     if is_trucker_style(hat_style):
         front_clause = (
             "are made of a high-quality fabric that best fits the design direction"
@@ -110,16 +112,12 @@ def format_style_direction(direction: str) -> str:
 
 def format_structure(structure: Optional[str]) -> Optional[str]:
     """Convert structure code to display name."""
-    if not structure:
-        return None
-    return STRUCTURES.get(structure, structure)
+    return STRUCTURES.get(structure, structure) if structure else None
 
 
 def format_closure(closure: Optional[str]) -> Optional[str]:
     """Convert closure code to display name."""
-    if not closure:
-        return None
-    return CLOSURES.get(closure, closure)
+    return CLOSURES.get(closure, closure) if closure else None
 
 
 # Map internal location codes (used in form values) to the canonical
@@ -127,51 +125,24 @@ def format_closure(closure: Optional[str]) -> Optional[str]:
 # IMPORTANT: "left" and "right" in the form mean "wearer's left/right" —
 # the side facing the camera in the WEARERS LEFT / WEARERS RIGHT views
 # of the result template.
-LOCATION_PROMPT_LABELS: Dict[str, str] = {
+LOCATION_PROMPT_LABELS: Mapping[str, str] = MappingProxyType({
     "front": "FRONT",
     "back": "BACK",
     "left": "WEARER'S LEFT side (the side facing the camera in the WEARERS LEFT view of the result template)",
     "right": "WEARER'S RIGHT side (the side facing the camera in the WEARERS RIGHT view of the result template)",
     "visor": "UNDERBILL (inside the visor/brim)",
     "underbill": "UNDERBILL (inside the visor/brim)",
-}
+})
 
 
-def build_logo_placement_instructions(logos: List[Dict[str, Any]]) -> str:
-    """Build prompt section describing how to place multiple named logos."""
-    lines = []
-    lines.append("LOGOS PROVIDED:")
-
-    assigned_logos = []
-    unassigned_logos = []
-
-    for logo in logos:
-        name = logo.get('name', 'Logo')
-        location = (logo.get('location') or '').lower().strip()
-        if location:
-            label = LOCATION_PROMPT_LABELS.get(location, location.upper())
-            assigned_logos.append((name, location))
-            lines.append(f"- '{name}' → Place on the **{label}** of the hat")
-        else:
-            unassigned_logos.append(name)
-            lines.append(f"- '{name}' → Place at the best location (AI's choice)")
-
-    lines.append("")
-    lines.append("IMPORTANT - LOGO USAGE: Use ONLY the provided logo images labeled above. Do NOT search for or use any other logos from the internet. Each logo image is labeled with its name.")
-    lines.append(
-        "IMPORTANT - SIDE PERSPECTIVE: All references to 'left' and 'right' are from the WEARER's perspective, "
-        "not the viewer's. The wearer's left side is on the right side of the image when viewing the FRONT view. "
-        "This must match the WEARERS LEFT / WEARERS RIGHT labels in the result template's 6-view layout."
-    )
-
-    if unassigned_logos:
-        names = ", ".join(f"'{n}'" for n in unassigned_logos)
-        lines.append(
-            f"\nFor logos marked as AI's choice ({names}), place them at appropriate locations that complement "
-            f"the overall design. Choose from: front, wearer's left side, wearer's right side, back, or underbrim."
-        )
-
-    lines.append("""
+# Fixed parts of the logo placement section
+_LOGO_NOTES = (
+    "IMPORTANT - LOGO USAGE: Use ONLY the provided logo images labeled above. Do NOT search for or use any other logos from the internet. Each logo image is labeled with its name.\n"
+    "IMPORTANT - SIDE PERSPECTIVE: All references to 'left' and 'right' are from the WEARER's perspective, "
+    "not the viewer's. The wearer's left side is on the right side of the image when viewing the FRONT view. "
+    "This must match the WEARERS LEFT / WEARERS RIGHT labels in the result template's 6-view layout."
+)
+_LOGO_DECORATION_RULES = """
 DECORATION RULES — MAXIMUM 3 LOCATIONS:
 Use no more than 3 decoration locations total. Keep the design clean and professional.
 Allowed methods per location:
@@ -180,12 +151,40 @@ Allowed methods per location:
 - WEARER'S RIGHT SIDE: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
 - BACK: flat embroidery ONLY.
 - UNDERBILL (inside visor): sublimated print ONLY.
-Do NOT use decoration methods not listed for a given location.""")
+Do NOT use decoration methods not listed for a given location."""
 
-    return "\n".join(lines)
 
+def build_logo_placement_instructions(logos: List[Dict[str, Any]]) -> str:
+    """Build prompt section describing how to place multiple named logos."""
+    placements = [
+        (logo.get('name', 'Logo'), (logo.get('location') or '').lower().strip())
+        for logo in logos
+    ]
+    label = LOCATION_PROMPT_LABELS.get
+    parts = [
+        "LOGOS PROVIDED:",
+        *[
+            f"- '{name}' → Place on the **{label(location) or location.upper()}** of the hat"
+            if location
+            else f"- '{name}' → Place at the best location (AI's choice)"
+            for name, location in placements
+        ],
+        "",
+        _LOGO_NOTES,
+    ]
+
+    unassigned_names = [f"'{name}'" for name, location in placements if not location]
+    if unassigned_names:
+        parts.append(
+            f"\nFor logos marked as AI's choice ({', '.join(unassigned_names)}), place them at appropriate locations that complement "
+            f"the overall design. Choose from: front, wearer's left side, wearer's right side, back, or underbrim."
+        )
 
-REFERENCE_INSTRUCTION_BLOCKS = {
+    parts.append(_LOGO_DECORATION_RULES)
+    return "\n".join(parts)
+
+
+REFERENCE_INSTRUCTION_BLOCKS = MappingProxyType({
     "close": """REFERENCE IMAGE — MATCH CLOSELY (a user-supplied reference image has been included with this prompt):
 - Treat the reference image as a near-target. Reproduce its silhouette, panel structure, color blocking, and decoration placement as faithfully as possible.
 - The customer's logos REPLACE any logos/branding visible in the reference. Drop the supplied logos into the same placements the reference uses.
@@ -197,7 +196,112 @@ REFERENCE_INSTRUCTION_BLOCKS = {
 - DO NOT copy its exact silhouette, panel layout, decoration placement, or logos. Create a fresh design that captures the same spirit.
 - The customer's brand and logos drive the final composition; the reference simply informs the aesthetic.
 - The output must still be a 6-view layout matching the layout template.""",
-}
+})
+
+
+def _render_construction_details(
+    formatted_structure: Optional[str],
+    formatted_closure: Optional[str],
+) -> str:
+    """Render the HAT CONSTRUCTION block, or "" when neither is set."""
+    if not (formatted_structure or formatted_closure):
+        return ""
+    construction_parts = []
+    if formatted_structure:
+        construction_parts.append(f"Structure: **{formatted_structure}**")
+    if formatted_closure:
+        construction_parts.append(f"Closure: **{formatted_closure}**")
+    return f"""
+
+HAT CONSTRUCTION:
+{chr(10).join('- ' + part for part in construction_parts)}
+"""
+
+
+# HAT CONSTRUCTION block per (structure, closure) code pair; None = not given
+_CONSTRUCTION_DETAILS: Mapping[Tuple[Optional[str], Optional[str]], str] = MappingProxyType({
+    (structure, closure): _render_construction_details(
+        STRUCTURES.get(structure), CLOSURES.get(closure)
+    )
+    for structure in (None, *STRUCTURES)
+    for closure in (None, *CLOSURES)
+})
+
+# Logo section used when no named logos were supplied
+_DEFAULT_LOGO_SECTION: Final[str] = """IMPORTANT - LOGO USAGE: If a logo image has been provided with this prompt, you MUST use that exact logo in your design. Do NOT search for or use any other logos from the internet. Use ONLY the submitted logo artwork. If no logo is provided, create a simple text-based design using the brand name.
+
+IMPORTANT - SIDE PERSPECTIVE: All references to 'left' and 'right' are from the WEARER's perspective, not the viewer's. This must match the WEARERS LEFT / WEARERS RIGHT labels in the result template's 6-view layout.
+
+DECORATION LOCATIONS — MAXIMUM 3 locations. Choose up to 3 from the following:
+1. FRONT: Always include a decoration on the front. Methods: flat embroidery, 3D embroidery, PVC patch, woven patch, faux leather patch, embroidered patch, sublimated patch, or 3D printing.
+2. SIDE (choose ONE — wearer's left or wearer's right, not both): Methods: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
+3. BACK: Method: flat embroidery ONLY.
+4. UNDERBILL (inside visor): Method: sublimated print ONLY.
+
+STRICT: Do NOT use more than 3 decoration locations. Do NOT use decoration methods not listed for a given location. Keep the design clean and professional."""
+
+# Design prompt, filled with str.format_map. Placeholders: style,
+# construction, construction_details, client_name, style_desc,
+# reference_block, brand_colors_block, brand_guidelines_block, logo_section,
+# variation_hint. The legal text never varies, so it's appended here once.
+_DESIGN_PROMPT_TEMPLATE = """RENDERING STYLE — READ FIRST:
+The output is a PHOTOREALISTIC studio product photograph composed in a 3x2 grid.
+- All six cells must look like real photographs of a real physical hat (and a real human in cell 6).
+- DO NOT produce cartoon, illustration, line-art, vector-flat, watercolor, painted, sketched, or otherwise stylized output.
+- The layout template image provided alongside this prompt is itself a cartoon line-art illustration — that is for STRUCTURE ONLY. Its art style must NOT appear in your output.
+- Lighting: soft professional studio lighting. Background: clean neutral white (#f5f5f7-ish). Materials: realistic fabric weave, stitching, and shadow detail.
+
+A photorealistic product shot of a **{style}**.
+
+CONSTRUCTION & MATERIALS: {construction}{construction_details}
+
+The brand is **{client_name}**.
+
+The overall design vibe is **{style_desc}**.
+{reference_block}{brand_colors_block}{brand_guidelines_block}
+{logo_section}
+
+DECORATION METHOD CALLOUTS:
+Label each unique decoration ONCE across the entire image. Rules:
+- Each decoration method should be labeled EXACTLY ONCE in the view where it is most clearly visible. Do NOT label the same decoration in multiple views.
+- Format: thin line or arrow from label to the decoration it identifies.
+- Label text = exact method name, e.g. "Flat Embroidery", "3D Embroidery", "PVC Patch", "Woven Patch", "Sublimated Patch", "Sublimated Print".
+- Style: clean sans-serif font, black text on a small white pill/tag background.
+- Do NOT add ANY labels to the MODEL VIEW (view #6). The model view should be clean with no callouts.
+- Only label decorations in hat-only views (views 1-5). Pick the view where each decoration is most prominent.
+
+IMAGE LAYOUT — Match the provided LAYOUT TEMPLATE image precisely. The template defines a 3x2 grid with EXACTLY 6 UNIQUE VIEWS. Use the template ONLY for grid composition and angle labels — do not copy its hat shape, colors, or design.
+
+Each view shows the SAME hat from a DIFFERENT angle. Same design, same colors, same logos, same decorations in every view.
+
+Top row:
+1. **FRONT** (top-left) — hat facing camera straight-on, front panel visible
+2. **WEARERS RIGHT** (top-center) — hat rotated so the WEARER'S RIGHT side faces the camera; the brim points to the LEFT side of the image
+3. **WEARERS LEFT** (top-right) — hat rotated so the WEARER'S LEFT side faces the camera; the brim points to the RIGHT side of the image
+
+Bottom row:
+4. **BACK** (bottom-left) — hat rotated 180°, back panel and closure visible
+5. **UNDERVISOR** (bottom-center) — hat flipped to show the underside of the visor/brim and the sweatband
+6. **MODEL** (bottom-right) — PHOTOREALISTIC professional studio photograph of a real adult male model wearing the hat, head-and-shoulders portrait. This must look like an actual photo of a real person — NOT a cartoon, NOT an illustration, NOT a stylized drawing, NOT line-art. Skin, hair, fabric textures must all read as photographic. Ignore the cartoon person shown in the layout template — the template's art style is for layout reference only and must NOT be reproduced in this cell.
+
+Place the angle labels (FRONT, WEARERS RIGHT, WEARERS LEFT, BACK, UNDERVISOR, MODEL) under each box exactly as shown in the LAYOUT TEMPLATE.
+
+STRICT RULES:
+- Exactly 6 views. Not 4, not 5, not 7, not 8. Exactly 6.
+- Each view must show a DIFFERENT angle — no duplicate or near-duplicate views.
+- WEARERS RIGHT and WEARERS LEFT are mirror images — they must NOT look the same. WEARERS RIGHT shows the right side panel from the wearer's perspective; WEARERS LEFT shows the left side panel from the wearer's perspective.
+- The design must be IDENTICAL across all views — do not change decorations, colors, or logos between views.
+
+Professional studio lighting, white background, 4k resolution.
+
+DESIGN VARIATION: {variation_hint}
+
+Add the following legal language to the bottom of the image: """ + LEGAL_TEXT
+
+# Revision prompts wrap the original prompt and the notes with these, joined
+# in one allocation rather than formatted around the multi-KB original.
+_REVISION_HEADER = "\n\nREVISION REQUESTED:\n"
+_REVISION_TAIL = "\n\nPlease generate a revised version of the hat design incorporating the requested changes while maintaining the overall brand aesthetic and quality standards."
 
 
 def build_design_prompt(
@@ -231,12 +335,39 @@ def build_design_prompt(
     Returns:
         The complete prompt string for image generation
     """
-    formatted_style = format_hat_style(hat_style)
-    formatted_material = format_material(material)
-    construction_sentence = format_construction(hat_style, material)
-    formatted_structure = format_structure(structure)
-    formatted_closure = format_closure(closure)
+    # Cached on hashable copies of the list arguments. Logos keep only the
+    # fields the prompt reads; non-string colors are dropped by the prompt anyway.
+    logos_key = tuple(
+        (logo.get('name', 'Logo'), logo.get('location')) for logo in logos
+    ) if logos else None
+    colors_key = tuple(c for c in brand_colors or () if isinstance(c, str))
+    return _build_design_prompt_cached(
+        hat_style, material, client_name, style_direction, custom_description,
+        structure, closure, logos_key, variation_index, reference_match_mode,
+        colors_key, brand_guidelines_text,
+    )
 
+
+# Prompts are pure functions of the form, and the same design is often
+# rebuilt (regenerations, variation passes), so whole prompts are cached.
+@lru_cache(maxsize=512)
+def _build_design_prompt_cached(
+    hat_style: str,
+    material: str,
+    client_name: str,
+    style_direction: str,
+    custom_description: Optional[str],
+    structure: Optional[str],
+    closure: Optional[str],
+    logos: Optional[Tuple[Tuple[Any, Any], ...]],
+    variation_index: int,
+    reference_match_mode: Optional[str],
+    brand_colors: Tuple[str, ...],
+    brand_guidelines_text: Optional[str],
+) -> str:
+    # Table lookups inlined rather than going through the format_* wrappers
+    formatted_style = HAT_STYLES.get(hat_style, hat_style)
+    construction_sentence = format_construction(hat_style, material)
     # Style directions may arrive as a single value or as " and "-joined values
     # from the router. Strip the "describe-below" sentinel from the list — when
     # selected, the user is signaling: "ignore preset directions, use my text."
@@ -245,7 +376,8 @@ def build_design_prompt(
     only_describe_below = bool(raw_parts) and not filtered_parts
 
     if filtered_parts:
-        formatted_direction = format_style_direction(" and ".join(filtered_parts))
+        joined_direction = " and ".join(filtered_parts)
+        formatted_direction = STYLE_DIRECTIONS.get(joined_direction, joined_direction)
         style_desc = formatted_direction
         if custom_description:
             style_desc = f"{formatted_direction}. {custom_description}"
@@ -258,35 +390,22 @@ def build_design_prompt(
         # Final fallback if nothing was provided.
         style_desc = "Modern"
 
-    # Build construction details if provided
-    construction_details = ""
-    if formatted_structure or formatted_closure:
-        construction_parts = []
-        if formatted_structure:
-            construction_parts.append(f"Structure: **{formatted_structure}**")
-        if formatted_closure:
-            construction_parts.append(f"Closure: **{formatted_closure}**")
-        construction_details = f"""
-
-HAT CONSTRUCTION:
-{chr(10).join('- ' + part for part in construction_parts)}
-"""
+    # Construction details: precomputed for every known structure/closure
+    # pair, rendered on the fly only for codes outside the tables
+    construction_details = _CONSTRUCTION_DETAILS.get((structure or None, closure or None))
+    if construction_details is None:
+        construction_details = _render_construction_details(
+            STRUCTURES.get(structure, structure) if structure else None,
+            CLOSURES.get(closure, closure) if closure else None,
+        )
 
     # Build logo instructions based on whether multi-logo is provided
-    if logos and len(logos) > 0:
-        logo_section = build_logo_placement_instructions(logos)
+    if logos:
+        logo_section = build_logo_placement_instructions(
+            [{'name': name, 'location': location} for name, location in logos]
+        )
     else:
-        logo_section = """IMPORTANT - LOGO USAGE: If a logo image has been provided with this prompt, you MUST use that exact logo in your design. Do NOT search for or use any other logos from the internet. Use ONLY the submitted logo artwork. If no logo is provided, create a simple text-based design using the brand name.
-
-IMPORTANT - SIDE PERSPECTIVE: All references to 'left' and 'right' are from the WEARER's perspective, not the viewer's. This must match the WEARERS LEFT / WEARERS RIGHT labels in the result template's 6-view layout.
-
-DECORATION LOCATIONS — MAXIMUM 3 locations. Choose up to 3 from the following:
-1. FRONT: Always include a decoration on the front. Methods: flat embroidery, 3D embroidery, PVC patch, woven patch, faux leather patch, embroidered patch, sublimated patch, or 3D printing.
-2. SIDE (choose ONE — wearer's left or wearer's right, not both): Methods: flat embroidery, 3D embroidery, woven patch, or sublimated patch ONLY.
-3. BACK: Method: flat embroidery ONLY.
-4. UNDERBILL (inside visor): Method: sublimated print ONLY.
-
-STRICT: Do NOT use more than 3 decoration locations. Do NOT use decoration methods not listed for a given location. Keep the design clean and professional."""
+        logo_section = _DEFAULT_LOGO_SECTION
 
     # Reference image instruction block — empty unless a reference image was uploaded.
     reference_block = ""
@@ -316,61 +435,18 @@ STRICT: Do NOT use more than 3 decoration locations. Do NOT use decoration metho
     # Get variation hint
     variation_hint = VARIATION_HINTS[variation_index % len(VARIATION_HINTS)]
 
-    prompt = f"""RENDERING STYLE — READ FIRST:
-The output is a PHOTOREALISTIC studio product photograph composed in a 3x2 grid.
-- All six cells must look like real photographs of a real physical hat (and a real human in cell 6).
-- DO NOT produce cartoon, illustration, line-art, vector-flat, watercolor, painted, sketched, or otherwise stylized output.
-- The layout template image provided alongside this prompt is itself a cartoon line-art illustration — that is for STRUCTURE ONLY. Its art style must NOT appear in your output.
-- Lighting: soft professional studio lighting. Background: clean neutral white (#f5f5f7-ish). Materials: realistic fabric weave, stitching, and shadow detail.
-
-A photorealistic product shot of a **{formatted_style}**.
-
-CONSTRUCTION & MATERIALS: {construction_sentence}{construction_details}
-
-The brand is **{client_name}**.
-
-The overall design vibe is **{style_desc}**.
-{reference_block}{brand_colors_block}{brand_guidelines_block}
-{logo_section}
-
-DECORATION METHOD CALLOUTS:
-Label each unique decoration ONCE across the entire image. Rules:
-- Each decoration method should be labeled EXACTLY ONCE in the view where it is most clearly visible. Do NOT label the same decoration in multiple views.
-- Format: thin line or arrow from label to the decoration it identifies.
-- Label text = exact method name, e.g. "Flat Embroidery", "3D Embroidery", "PVC Patch", "Woven Patch", "Sublimated Patch", "Sublimated Print".
-- Style: clean sans-serif font, black text on a small white pill/tag background.
-- Do NOT add ANY labels to the MODEL VIEW (view #6). The model view should be clean with no callouts.
-- Only label decorations in hat-only views (views 1-5). Pick the view where each decoration is most prominent.
-
-IMAGE LAYOUT — Match the provided LAYOUT TEMPLATE image precisely. The template defines a 3x2 grid with EXACTLY 6 UNIQUE VIEWS. Use the template ONLY for grid composition and angle labels — do not copy its hat shape, colors, or design.
-
-Each view shows the SAME hat from a DIFFERENT angle. Same design, same colors, same logos, same decorations in every view.
-
-Top row:
-1. **FRONT** (top-left) — hat facing camera straight-on, front panel visible
-2. **WEARERS RIGHT** (top-center) — hat rotated so the WEARER'S RIGHT side faces the camera; the brim points to the LEFT side of the image
-3. **WEARERS LEFT** (top-right) — hat rotated so the WEARER'S LEFT side faces the camera; the brim points to the RIGHT side of the image
-
-Bottom row:
-4. **BACK** (bottom-left) — hat rotated 180°, back panel and closure visible
-5. **UNDERVISOR** (bottom-center) — hat flipped to show the underside of the visor/brim and the sweatband
-6. **MODEL** (bottom-right) — PHOTOREALISTIC professional studio photograph of a real adult male model wearing the hat, head-and-shoulders portrait. This must look like an actual photo of a real person — NOT a cartoon, NOT an illustration, NOT a stylized drawing, NOT line-art. Skin, hair, fabric textures must all read as photographic. Ignore the cartoon person shown in the layout template — the template's art style is for layout reference only and must NOT be reproduced in this cell.
-
-Place the angle labels (FRONT, WEARERS RIGHT, WEARERS LEFT, BACK, UNDERVISOR, MODEL) under each box exactly as shown in the LAYOUT TEMPLATE.
-
-STRICT RULES:
-- Exactly 6 views. Not 4, not 5, not 7, not 8. Exactly 6.
-- Each view must show a DIFFERENT angle — no duplicate or near-duplicate views.
-- WEARERS RIGHT and WEARERS LEFT are mirror images — they must NOT look the same. WEARERS RIGHT shows the right side panel from the wearer's perspective; WEARERS LEFT shows the left side panel from the wearer's perspective.
-- The design must be IDENTICAL across all views — do not change decorations, colors, or logos between views.
-
-Professional studio lighting, white background, 4k resolution.
-
-DESIGN VARIATION: {variation_hint}
-
-Add the following legal language to the bottom of the image: {LEGAL_TEXT}"""
-
-    return prompt
+    return _DESIGN_PROMPT_TEMPLATE.format_map({
+        "style": formatted_style,
+        "construction": construction_sentence,
+        "construction_details": construction_details,
+        "client_name": client_name,
+        "style_desc": style_desc,
+        "reference_block": reference_block,
+        "brand_colors_block": brand_colors_block,
+        "brand_guidelines_block": brand_guidelines_block,
+        "logo_section": logo_section,
+        "variation_hint": variation_hint,
+    })
 
 
 def build_revision_prompt(
@@ -387,9 +463,4 @@ def build_revision_prompt(
     Returns:
         The complete prompt for revision
     """
-    return f"""{original_prompt}
-
-REVISION REQUESTED:
-{revision_notes}
-
-Please generate a revised version of the hat design incorporating the requested changes while maintaining the overall brand aesthetic and quality standards."""
+    return "".join((original_prompt, _REVISION_HEADER, revision_notes, _REVISION_TAIL))
@@ -2,7 +2,8 @@
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError
 from sqlalchemy.orm import Session
 from typing import Optional
 
@@ -25,7 +26,7 @@ def decode_store_token(token: str) -> Optional[dict]:
         if user_id is None or user_type != "store":
             return None
         return payload
-    except JWTError:
+    except InvalidTokenError:
         return None
 
 
@@ -0,0 +1 @@
+"""Pytest root: puts backend/ on sys.path so tests can import the app package."""
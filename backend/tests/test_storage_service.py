@@ -0,0 +1,81 @@
+"""Tests for upload sniffing and base64 decoding in the storage service."""
+
+import asyncio
+import base64
+import io
+import os
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+from starlette.datastructures import Headers
+
+from app.services import r2_service, storage_service
+
+
+def _mpo_bytes() -> bytes:
+    """A two-frame multi-picture JPEG, as written by phones with depth/gain maps."""
+    primary = Image.new("RGB", (16, 16), "red")
+    secondary = Image.new("RGB", (16, 16), "blue")
+    buf = io.BytesIO()
+    primary.save(buf, "MPO", save_all=True, append_images=[secondary])
+    return buf.getvalue()
+
+
+def _upload(content: bytes, filename: str, content_type: str) -> UploadFile:
+    return UploadFile(
+        file=io.BytesIO(content),
+        filename=filename,
+        size=len(content),
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.fixture
+def local_storage(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_service, "_UPLOAD_DIR", tmp_path)
+    monkeypatch.setattr(r2_service, "_use_r2", lambda: False)
+    return tmp_path
+
+
+def test_sniff_raster_treats_mpo_as_jpeg():
+    assert storage_service._sniff_raster(_mpo_bytes()) == ("image/jpeg", ".jpg")
+
+
+def test_sniff_raster_raises_on_corrupt_content():
+    with pytest.raises(Exception):
+        storage_service._sniff_raster(b"not an image")
+
+
+def test_save_upload_file_accepts_mpo_jpeg(local_storage):
+    content = _mpo_bytes()
+    path, mime_type, size = asyncio.run(
+        storage_service.save_upload_file(_upload(content, "photo.jpeg", "image/jpeg"), "logos")
+    )
+    assert mime_type == "image/jpeg"
+    assert path.startswith("logos/") and path.endswith(".jpg")
+    assert size == len(content)
+    assert (local_storage / path).read_bytes() == content
+
+
+def test_save_upload_file_rejects_corrupt_jpeg(local_storage):
+    with pytest.raises(ValueError, match="not a valid PNG, JPEG, or WEBP"):
+        asyncio.run(
+            storage_service.save_upload_file(_upload(b"not an image", "photo.jpg", "image/jpeg"), "logos")
+        )
+
+
+@pytest.mark.parametrize("wrap", ["", "\n", "\r\n"])
+def test_b64decode_chunks_matches_b64decode_across_slices(wrap):
+    raw = os.urandom(storage_service._B64_CHUNK_CHARS)  # encodes to more than one slice
+    text = base64.b64encode(raw).decode()
+    if wrap:
+        text = base64.encodebytes(raw).decode().replace("\n", wrap)
+    assert b"".join(storage_service._b64decode_chunks(text)) == base64.b64decode(text) == raw
+
+
+def test_save_generated_image_decodes_wrapped_base64(local_storage):
+    raw = os.urandom(400_000)
+    text = base64.encodebytes(raw).decode().replace("\n", "\r\n")
+    path = asyncio.run(storage_service.save_generated_image(text, "design", 1))
+    assert (local_storage / path).read_bytes() == raw
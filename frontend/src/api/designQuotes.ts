@@ -30,8 +30,9 @@ export interface DesignQuote {
   // Cached results
   cached_price_breaks: Array<{
     quantity_break: number;
-    per_piece_price: number | null;
-    total: number | null;
+    meets_moq?: boolean;
+    per_piece_price?: number | null;
+    total?: number | null;
     [key: string]: unknown;
   }> | null;
   cached_total: number | null;
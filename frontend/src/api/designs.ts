@@ -11,6 +11,7 @@ export interface DesignFilters {
   end_date?: string;
   skip?: number;
   limit?: number;
+  cursor?: string;
 }
 
 export const designsApi = {
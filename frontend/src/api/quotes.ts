@@ -26,13 +26,16 @@ export interface OverseasQuoteRequest {
   shipping_method?: string;
 }
 
+// Overseas breaks that don't meet MOQ carry only quantity_break and
+// meets_moq: false; every price field is absent.
 export interface PriceBreak {
   quantity_break: number;
-  blank_price: number | null;
-  front_decoration_price: number | null;
-  left_decoration_price: number | null;
-  right_decoration_price: number | null;
-  back_decoration_price: number | null;
+  meets_moq?: boolean;
+  blank_price?: number | null;
+  front_decoration_price?: number | null;
+  left_decoration_price?: number | null;
+  right_decoration_price?: number | null;
+  back_decoration_price?: number | null;
   visor_decoration_price?: number | null;
   rush_fee?: number | null;
   rope_price?: number | null;
@@ -40,10 +43,10 @@ export interface PriceBreak {
   accessories_price?: number | null;
   hat_subtotal?: number | null;
   shipping_price?: number | null;
-  per_piece_price: number | null;
+  per_piece_price?: number | null;
   digitizing_fee?: number | null;
   subtotal?: number | null;
-  total: number | null;
+  total?: number | null;
 }
 
 export interface DomesticQuoteResponse {
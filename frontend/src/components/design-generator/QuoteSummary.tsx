@@ -13,11 +13,11 @@ interface QuoteSummaryProps {
 }
 
 // Helper to check if a price break meets MOQ
-const meetsMoq = (pb: { per_piece_price: number | null }) => pb.per_piece_price !== null;
+const meetsMoq = (pb: { per_piece_price?: number | null }) => pb.per_piece_price != null;
 
 // Calculate hat cost per piece (all costs except shipping)
 const getHatCost = (pb: Record<string, unknown>) => {
-  if (!meetsMoq(pb as { per_piece_price: number | null })) return null;
+  if (!meetsMoq(pb as { per_piece_price?: number | null })) return null;
   return (
     ((pb.blank_price as number) || 0) +
     ((pb.front_decoration_price as number) || 0) +
@@ -120,7 +120,7 @@ export function QuoteSummary({ quote, onEdit, onDelete, onExport, isDeleting, is
               <tr>
                 <td className="py-2 px-1 text-gray-300">Shipping</td>
                 {priceBreaks!.map((pb) => {
-                  const shippingCost = meetsMoq(pb as { per_piece_price: number | null })
+                  const shippingCost = meetsMoq(pb as { per_piece_price?: number | null })
                     ? ((pb as Record<string, unknown>).shipping_price as number || 0)
                     : null;
                   return (
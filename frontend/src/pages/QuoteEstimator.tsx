@@ -952,8 +952,8 @@ function OverseasResults({ result, formData }: { result: OverseasQuoteResponse;
     hatDetails.push(`Accessories: ${result.accessories.join(', ')}`);
   }
 
-  // Check if a price break meets MOQ (per_piece_price is not null)
-  const meetsMoq = (pb: typeof result.price_breaks[0]) => pb.per_piece_price !== null;
+  // Check if a price break meets MOQ (MOQ-fail breaks omit per_piece_price)
+  const meetsMoq = (pb: typeof result.price_breaks[0]) => pb.per_piece_price != null;
 
   // Calculate hat cost per piece for each quantity break
   const getHatCost = (pb: typeof result.price_breaks[0]) => {